@@ -163,6 +163,6 @@ class BookManagementGui:
         self.root.mainloop()
 
 if __name__ == "__main__":
-    book_manager = BookManager()
+    book_manager = BookManager.shared()
     gui = BookManagementGui(book_manager)
     gui.run()
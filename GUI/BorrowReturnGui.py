@@ -1,5 +1,5 @@
 import tkinter as tk
-from tkinter import messagebox, simpledialog
+from tkinter import messagebox
 from classes.BorrowingManager import BorrowingManager
 
 class BorrowReturnGui:
@@ -29,6 +29,10 @@ class BorrowReturnGui:
         self.title_entry = tk.Entry(frame, width=40)
         self.title_entry.pack()
 
+        tk.Label(frame, text="User Name", bg="pink").pack()
+        self.user_entry = tk.Entry(frame, width=40)
+        self.user_entry.pack()
+
         if self.mode == "borrow":
             tk.Button(frame, text="Borrow Book", command=self.lend_book, bg="green", fg="white", font=("Arial", 12)).pack(pady=20)
         elif self.mode == "return":
@@ -48,46 +52,40 @@ class BorrowReturnGui:
 
     def lend_book(self):
         title = self.title_entry.get()
-        if not title:
-            messagebox.showerror("Error", "The Title field is required.")
+        user_name = self.user_entry.get()
+        if not title or not user_name:
+            messagebox.showerror("Error", "The Title and User Name fields are required.")
             return
         try:
             book_exists = self.borrowing_manager.book_manager.book_exists(title)  # Assuming book_exists is a method
             if not book_exists:
                 messagebox.showerror("Error", f"The book '{title}' does not exist in the system.")
                 return
-            # Attempt to borrow the book directly
-            success = self.borrowing_manager.borrow_book(title)
-            if success:
-                messagebox.showinfo("Success", f"Book '{title}' borrowed successfully.")
+            # Borrows a copy, or adds the user to the waiting list if none is free
+            success = self.borrowing_manager.borrow_book(title, username=user_name)
+            book = self.borrowing_manager.book_manager.find_book(title)
+            if not success:
+                messagebox.showerror("Error", f"Failed to borrow the book '{title}' for {user_name}.")
+            elif book is not None and user_name in book.waiting_list_manager.get_waiting_list():
+                messagebox.showinfo("Success", f"The book is on loan. {user_name} has been added to the waiting list for '{title}'.")
             else:
-                # Borrowing failed: Prompt for user name to join the waiting list
-                user_name = simpledialog.askstring("User Name",
-                                                   "The book is on loan. Enter your name to join the waiting list:")
-                if not user_name:
-                    messagebox.showerror("Error", "User name is required to join the waiting list.")
-                    return
-                # Add the user to the waiting list
-                added_to_waiting_list = self.borrowing_manager.borrow_book(title, username=user_name)
-                if added_to_waiting_list:
-                    messagebox.showinfo("Success", f"{user_name} has been added to the waiting list for '{title}'.")
-                else:
-                    messagebox.showerror("Error", f"Failed to add {user_name} to the waiting list for '{title}'.")
+                messagebox.showinfo("Success", f"Book '{title}' borrowed successfully by {user_name}.")
         except Exception as e:
             print(f"Error in lend_book: {e}")
             messagebox.showerror("Error", f"Unexpected error: {e}")
 
     def return_book(self):
         title = self.title_entry.get()
-        if not title:
-            messagebox.showerror("Error", "The Title field is required.")
+        user_name = self.user_entry.get()
+        if not title or not user_name:
+            messagebox.showerror("Error", "The Title and User Name fields are required.")
             return
         try:
-            success = self.borrowing_manager.return_book(title)
+            success = self.borrowing_manager.return_book(title, username=user_name)
             if success:
-                messagebox.showinfo("Success", f"Book '{title}' returned successfully.")
+                messagebox.showinfo("Success", f"Book '{title}' returned successfully by {user_name}.")
             else:
-                messagebox.showerror("Error", f"Failed to return the book '{title}'.")
+                messagebox.showerror("Error", f"Failed to return the book '{title}' for {user_name}.")
         except Exception as e:
             messagebox.showerror("Error", f"Unexpected error: {e}")
 
@@ -6,7 +6,12 @@ from BorrowReturnGui import BorrowReturnGui
 from GUI.AuthGui import AuthGui
 from classes.BookManager import BookManager
 from classes.BorrowingManager import BorrowingManager
+from classes.HoldManager import HoldManager
+from classes.LoanLedger import LoanLedger
 from classes.Logger import Logger
+from classes.NotificationDispatcher import NotificationDispatcher
+from classes.WaitingListManager import WaitingListManager
+from classes.ResultCache import ResultCache
 from classes.SearchManager import SearchManager
 from tkinter import messagebox
 
@@ -14,9 +19,15 @@ from tkinter import messagebox
 class MainMenuGui:
     def __init__(self, user=None):
         self.user = user  # Store the current logged-in user
-        self.book_manager = BookManager()  # Initialize BookManager once
-        self.borrowing_manager = BorrowingManager()  # Initialize BorrowingManager once
-        self.search_manager = SearchManager(self.book_manager, None)  # Initialize SearchManager
+        self.book_manager = BookManager.shared()  # Catalog is loaded once and shared by every manager
+        if "popularity" not in self.book_manager.indexes:
+            self.book_manager.enable_popularity_index()  # "Popular" view reads the top books instead of sorting
+        # Returned copies are held for the next waiting user; holds survive a restart through holds.journal
+        self.hold_manager = HoldManager(file_handler=self.book_manager.file_handler)
+        self.borrowing_manager = BorrowingManager(self.book_manager, self.hold_manager,
+                                                  ledger=LoanLedger(self.book_manager.file_handler))  # Initialize BorrowingManager once
+        self.hold_manager.start()  # Expires holds as their deadlines pass
+        self.search_manager = SearchManager(self.book_manager, None, cache=ResultCache())  # Repeated searches are served from the cache
 
 
         self.root = tk.Tk()  # Main application root (Tk root for the main window)
@@ -62,6 +73,7 @@ class MainMenuGui:
 
     def open_search_books_gui(self):
         self.root.withdraw()
+        self.book_manager.refresh_if_changed()  # Pick up books saved by other instances
         try:
             search_gui_root = tk.Toplevel(self.root)
             search_app = SearchBooksGui(search_gui_root, self.search_manager,self.return_to_main_menu)
@@ -71,6 +83,7 @@ class MainMenuGui:
 
     def open_view_books_gui(self):
         self.root.withdraw()
+        self.book_manager.refresh_if_changed()  # Pick up books saved by other instances
         try:
             app = DisplayBooksGui(self.search_manager, self.return_to_main_menu)
         except Exception as e:
@@ -116,6 +129,8 @@ class MainMenuGui:
         self.root.mainloop()
 
 if __name__ == "__main__":
+    Logger.enable_queue()  # Log lines are written by a background thread and flushed on exit
+    WaitingListManager.dispatcher = NotificationDispatcher()  # Returning a book only queues the notifications
     try:
         auth_app = AuthGui(on_success=MainMenuGui)
         auth_app.run("login")
@@ -89,7 +89,7 @@ class SearchBooksGui:
         self.search_type_label.pack(pady=10)
 
         self.search_type_combobox = ttk.Combobox(
-            self.search_frame, values=["title", "author", "genre", "year", "copies_available"], font=("Arial", 12)
+            self.search_frame, values=["title", "author", "genre", "year", "copies_available", "year_range", "copies_available_range"], font=("Arial", 12)
         )
         self.search_type_combobox.pack(pady=5)
 
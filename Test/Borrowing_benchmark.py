@@ -0,0 +1,71 @@
+# Timing of the circulation paths; not part of the unit tests. Run with: python -m Test.Borrowing_benchmark
+import io
+import random
+import threading
+import time
+from contextlib import redirect_stdout
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+from classes.Book import Book
+from classes.BookManager import BookManager
+from classes.BorrowingManager import BorrowingManager
+
+
+def book_manager_in_memory():
+    file_handler = MagicMock()
+    file_handler.load_csv.return_value = pd.DataFrame()
+    return BookManager(derived_views="off", file_handler=file_handler, group_commit_changes=50)
+
+
+def borrow_return_throughput(books=20, copies=5, pairs=400):
+    """Borrow/return pairs per second by thread count."""
+    book_manager = book_manager_in_memory()
+    for i in range(books):
+        book_manager.add_book(f"Book{i}", "Author", "Genre", 2000, copies)
+    borrowing_manager = BorrowingManager(book_manager)
+
+    throughput = {}
+    for threads in (1, 2, 4, 8):
+        operations = pairs // threads
+        start = threading.Barrier(threads)
+
+        def run(seed):
+            rng = random.Random(seed)
+            start.wait()
+            for _ in range(operations):
+                title = f"Book{rng.randrange(books)}"
+                if borrowing_manager.borrow_book(title):
+                    borrowing_manager.return_book(title)
+
+        workers = [threading.Thread(target=run, args=(seed,)) for seed in range(threads)]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        throughput[threads] = round(operations * threads / (time.perf_counter() - started))
+    return throughput
+
+
+def bulk_seconds(books=1000, items=5000):
+    """Seconds to borrow_many and then return_many `items` items spread over `books` books."""
+    book_manager = book_manager_in_memory()
+    book_manager.books = [Book(f"Book{i}", "Author", False, 5, "Genre", 2000) for i in range(books)]
+    borrowing_manager = BorrowingManager(book_manager)
+    bulk = [(f"Book{i % books}", f"student{i}") for i in range(items)]
+
+    started = time.perf_counter()
+    borrowing_manager.borrow_many(bulk)
+    borrowing_manager.return_many(bulk)
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    # The circulation calls report every operation; keep only the results
+    with redirect_stdout(io.StringIO()):
+        throughput = borrow_return_throughput()
+        elapsed = bulk_seconds()
+    print(f"Borrow/return pairs per second by thread count: {throughput}")
+    print(f"Bulk borrowed and returned 5000 items in {elapsed:.3f}s")
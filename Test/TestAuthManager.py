@@ -1,7 +1,9 @@
 import unittest
 import os
+import tempfile
 import pandas as pd
 from unittest.mock import patch, MagicMock
+from classes.FileHandler import FileHandler
 from classes.AuthManager import AuthManager  # Replace with the actual file name containing your AuthManager class
 
 class TestAuthManager(unittest.TestCase):
@@ -38,9 +40,10 @@ class TestAuthManager(unittest.TestCase):
         response = self.auth_manager.register("test_user", "test_password")
 
         self.assertEqual(response, "Registration successful.")
-        self.mock_file_handler.save_csv.assert_called_once()
-        saved_data = self.mock_file_handler.save_csv.call_args[0][1]
-        self.assertTrue("test_user" in saved_data["username"].values)
+        self.mock_file_handler.save_csv.assert_not_called()
+        self.mock_file_handler.append_csv.assert_called_once()
+        saved_data = self.mock_file_handler.append_csv.call_args[0][1]
+        self.assertEqual(list(saved_data["username"]), ["test_user"])
 
     def test_register_existing_user(self):
         # Mock users file with an existing user
@@ -79,5 +82,26 @@ class TestAuthManager(unittest.TestCase):
         response = self.auth_manager.login("test_user", "wrong_password")
         self.assertEqual(response, "Login failed: Invalid username or password.")
 
+    def test_import_users_and_refresh(self):
+        with tempfile.TemporaryDirectory() as data_dir:
+            auth_manager = AuthManager(file_handler=FileHandler(data_dir))
+            import_file = os.path.join(data_dir, "librarians.csv")
+            pd.DataFrame({"username": ["alice", "bob", "admin", "alice"],
+                          "password": ["a1", "b2", "x", "y"]}).to_csv(import_file, index=False)
+
+            self.assertEqual(auth_manager.import_users(import_file), 2)
+            self.assertEqual(auth_manager.login("alice", "a1"), "Login successful.")
+            self.assertEqual(auth_manager.login("admin", "x"), "Login failed: Invalid username or password.")
+            self.assertEqual(auth_manager.register("carol", "c3"), "Registration successful.")
+
+            users_file = os.path.join(data_dir, "users.csv")
+            self.assertEqual(list(pd.read_csv(users_file)["username"]), ["admin", "alice", "bob", "carol"])
+
+            # A change made by another process is picked up on the next login
+            pd.DataFrame({"username": ["dave"], "password_hash": [auth_manager.hash_password("d4")]}).to_csv(
+                users_file, index=False)
+            self.assertEqual(auth_manager.login("dave", "d4"), "Login successful.")
+            self.assertEqual(auth_manager.login("alice", "a1"), "Login failed: Invalid username or password.")
+
 if __name__ == "__main__":
     unittest.main()
@@ -40,5 +40,32 @@ class TestBookIterator(unittest.TestCase):
         with self.assertRaises(StopIteration):
             next(iter(self.empty_iterator))
 
+    def test_lazy_source(self):
+        """Test that a generator is only consumed as far as it is read."""
+        pulled = []
+
+        def generate():
+            for book in self.books:
+                pulled.append(book.title)
+                yield book
+
+        iterator = BookIterator(generate())
+        self.assertTrue(iterator)
+        self.assertEqual(iterator[1].title, "Book 1")
+        self.assertEqual(len(pulled), 2)
+        self.assertEqual(len(iterator), 5)
+        self.assertEqual([book.title for book in iterator], [book.title for book in self.books])
+
+    def test_page_and_cursor(self):
+        """Test offset paging and resumable cursors."""
+        iterator = BookIterator(book for book in self.books)
+        self.assertEqual([book.title for book in iterator.page(1, 2)], ["Book 1", "Book 2"])
+
+        books, cursor = iterator.fetch(limit=3)
+        self.assertEqual([book.title for book in books], ["Book 0", "Book 1", "Book 2"])
+        books, cursor = iterator.fetch(cursor, limit=3)
+        self.assertEqual([book.title for book in books], ["Book 3", "Book 4"])
+        self.assertIsNone(cursor)
+
 if __name__ == "__main__":
     unittest.main()
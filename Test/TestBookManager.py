@@ -1,12 +1,17 @@
+import os
+import tempfile
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 from classes.Book import Book
 from classes.BookManager import BookManager
+from classes.BorrowingManager import BorrowingManager
+from classes.FileHandler import FileHandler
 import pandas as pd
 
 class TestBookManager(unittest.TestCase):
     def setUp(self):
         self.mock_file_handler = MagicMock()
+        self.mock_file_handler.supports_row_updates.return_value = False
         self.book_manager = BookManager()
         self.book_manager.file_handler = self.mock_file_handler
 
@@ -65,6 +70,37 @@ class TestBookManager(unittest.TestCase):
         self.assertEqual(len(self.book_manager.books), 1)
         self.assertEqual(self.book_manager.books[0].title, "Book2")
 
+    def test_indexes_follow_add_and_remove(self):
+        book1 = Book("Book1", "Author1", False, 2, "Genre1", 2020)
+        book2 = Book("Book2", "Author2", False, 1, "Genre2", 2021)
+        book3 = Book("Book3", "Author3", False, 1, "Genre3", 2022)
+        self.book_manager.books = [book1, book2, book3]
+        self.book_manager.add_book("Book1", "Other Author", "Genre1", 2019, 1)
+
+        self.assertEqual(len({book.book_id for book in self.book_manager.books}), 4)
+        self.assertIs(self.book_manager.find_book("Book1"), book1)
+        self.assertEqual(self.book_manager.find_book("Book1", "Other Author").year, 2019)
+
+        self.assertTrue(self.book_manager.remove_book("Book1"))
+        self.assertFalse(self.book_manager.book_exists("Book1"))
+        self.assertIsNone(self.book_manager.find_book("Book1", "Author1"))
+        self.assertEqual(self.book_manager.books, [book2, book3])
+        self.assertIs(self.book_manager.get_book(book3.book_id), book3)
+
+    def test_removal_and_replay_keep_catalog_order(self):
+        books = [Book(f"Book{i}", "Author", False, 1, "Genre", 2000 + i) for i in range(5)]
+        self.book_manager.books = list(books)
+        self.book_manager.enable_search_indexes()
+        self.book_manager.remove_book("Book1")
+
+        updated = books[0].to_dict()
+        updated["copies_available"] = 0
+        self.book_manager._apply_record({"op": "upsert", "title": "Book0", "author": "Author", "book": updated})
+
+        self.assertEqual(self.book_manager.books, [books[0], books[2], books[3], books[4]])
+        self.assertEqual(books[0].copies_available, 0)
+        self.assertEqual(self.book_manager.indexes["title"].search("book"), self.book_manager.books)
+
     def test_save_books(self):
         book1 = Book("Book1", "Author1", False, 2, "Genre1", 2020)
         self.book_manager.books = [book1]
@@ -77,6 +113,45 @@ class TestBookManager(unittest.TestCase):
         self.mock_file_handler.save_csv.assert_any_call("loaned_books.csv", unittest.mock.ANY)
         self.mock_file_handler.save_csv.assert_any_call("available_books.csv", unittest.mock.ANY)
 
+    def test_derived_views_modes(self):
+        book1 = Book("Book1", "Author1", False, 2, "Genre1", 2020)
+        book2 = Book("Book2", "Author2", True, 1, "Genre2", 2021)
+
+        for mode, expected_files in [("always", 3), ("checkpoint", 1), ("lazy", 1), ("off", 1)]:
+            book_manager = BookManager(derived_views=mode)
+            book_manager.file_handler = MagicMock()
+            book_manager.books = [book1, book2]
+            book_manager.save_books()
+            self.assertEqual(book_manager.file_handler.save_csv.call_count, expected_files, mode)
+
+        book_manager = BookManager(derived_views="checkpoint")
+        book_manager.file_handler = MagicMock()
+        book_manager.books = [book1, book2]
+        book_manager.checkpoint()
+        self.assertEqual(book_manager.file_handler.save_csv.call_count, 3)
+
+    def test_export_view_is_incremental(self):
+        book_manager = BookManager(derived_views="lazy")
+        book_manager.file_handler = MagicMock()
+        book_manager.books = [Book("Book1", "Author1", False, 1, "Genre1", 2020)]
+        book_manager.books[0].copies_available = 0
+        book_manager.book_updated(book_manager.books[0])
+
+        self.assertTrue(book_manager.export_view("loaned"))
+        file_name, loaned_df = book_manager.file_handler.save_csv.call_args[0]
+        self.assertEqual(file_name, "loaned_books.csv")
+        self.assertEqual(list(loaned_df["title"]), ["Book1"])
+
+        self.assertTrue(book_manager.export_view("available"))
+        available_df = book_manager.file_handler.save_csv.call_args[0][1]
+        self.assertTrue(available_df.empty)
+        self.assertEqual(list(available_df.columns), BookManager.BOOK_COLUMNS)
+
+        with self.assertRaises(ValueError):
+            book_manager.export_view("overdue")
+        book_manager = BookManager(derived_views="off")
+        self.assertFalse(book_manager.export_view("loaned"))
+
     def test_load_books_empty(self):
         #  an empty file
         self.mock_file_handler.load_csv.return_value = pd.DataFrame()
@@ -103,6 +178,184 @@ class TestBookManager(unittest.TestCase):
         self.assertEqual(books[0].title, "Book1")
         self.assertTrue(books[1].is_loaned)
 
+    def test_load_books_chunked(self):
+        with tempfile.TemporaryDirectory() as data_dir:
+            pd.DataFrame({
+                "title": [f"Book{i}" for i in range(5)],
+                "author": ["Author"] * 5,
+                "is_loaned": ["False", "yes", " TRUE ", "no", "False"],
+                "copies": [1, 2, 3, 4, 5],
+                "genre": ["Genre"] * 5,
+                "year": [2000, 2001, 2002, 2003, 2004],
+            }).to_csv(os.path.join(data_dir, "books.csv"), index=False)
+            self.book_manager.file_handler = FileHandler(data_dir)
+
+            books = self.book_manager.load_books()
+            chunked_books = self.book_manager.load_books(chunksize=2)
+
+            self.assertEqual([b.to_dict() for b in books], [b.to_dict() for b in chunked_books])
+            self.assertEqual([b.is_loaned for b in books], [False, True, True, False, False])
+            self.assertEqual(books[4].year, 2004)
+
+    def test_save_and_load_are_lossless(self):
+        with tempfile.TemporaryDirectory() as data_dir:
+            self.book_manager.file_handler = FileHandler(data_dir)
+            book1 = Book("Book1", "Author1", False, 2, "Genre1", 2020)
+            book2 = Book("Book2", "Author2", False, 1, "Genre2", 2021)
+            book1.copies_available, book1.loaned_count, book1.popularity_count = 1, 5, 9
+            book2.copies_available, book2.is_loaned = 0, True
+            book2.waiting_list_manager.add_to_waiting_list("user1")
+            book2.waiting_list_manager.add_to_waiting_list("user2")
+            self.book_manager.books = [book1, book2]
+            self.book_manager.save_books()
+            expected = [book.to_dict() for book in self.book_manager.books]
+
+            for columnar in (False, True):
+                self.book_manager.columnar = columnar
+                books = self.book_manager.load_books()
+                self.assertEqual([book.to_dict() for book in books], expected)
+                # Waiting lists are only rehydrated when they are used
+                self.assertIsNone(books[0]._waiting_list_manager)
+                self.assertEqual(books[1]._waiting_list_manager, "user1,user2")
+                self.assertEqual(books[1].waiting_list_manager.remove_from_waiting_list(), "user1")
+                self.assertEqual(books[1].waiting_list, "user2")
+
+    def test_journal_mode_appends_and_replays(self):
+        with tempfile.TemporaryDirectory() as data_dir:
+            self.book_manager.file_handler = FileHandler(data_dir)
+            self.book_manager.journal_mode = True
+            self.book_manager.books = [Book("Book1", "Author1", False, 2, "Genre1", 2020)]
+            self.book_manager.checkpoint()
+
+            self.book_manager.add_book("Book2", "Author2", "Genre2", 2021, 1)
+            self.book_manager.books[0].copies_available = 1
+            self.book_manager.book_updated(self.book_manager.books[0])
+            self.book_manager.save_books()
+            self.book_manager.remove_book("Book2")
+
+            # Only the journal grew; the snapshot still holds the checkpointed state
+            snapshot = pd.read_csv(os.path.join(data_dir, "books.csv"))
+            self.assertEqual(list(snapshot["title"]), ["Book1"])
+            self.assertEqual(len(self.book_manager.file_handler.load_records(BookManager.JOURNAL_FILE)), 3)
+
+            self.book_manager.books = self.book_manager.load_books()
+            self.book_manager.replay_journal()
+            self.assertEqual([book.title for book in self.book_manager.books], ["Book1"])
+            self.assertEqual(self.book_manager.books[0].copies_available, 1)
+
+    def test_journal_mode_writes_rows_when_supported(self):
+        self.book_manager.journal_mode = True
+        self.book_manager.books = [Book("Book1", "Author1", False, 2, "Genre1", 2020)]
+        self.book_manager.add_book("Book1", "Author1", "Genre1", 2020, 1)
+        self.mock_file_handler.append_records.assert_called_once()
+        self.mock_file_handler.write_rows.assert_not_called()
+
+        self.mock_file_handler.supports_row_updates.return_value = True
+        self.book_manager.add_book("Book1", "Author1", "Genre1", 2020, 1)
+        self.mock_file_handler.write_rows.assert_called_once()
+        self.mock_file_handler.append_records.assert_called_once()
+
+    def test_journal_checkpoint_interval(self):
+        with tempfile.TemporaryDirectory() as data_dir:
+            self.book_manager.file_handler = FileHandler(data_dir)
+            self.book_manager.journal_mode = True
+            self.book_manager.checkpoint_interval = 2
+            self.book_manager.books = []
+
+            self.book_manager.add_book("Book1", "Author1", "Genre1", 2020, 1)
+            self.book_manager.add_book("Book2", "Author2", "Genre2", 2021, 1)
+
+            self.assertEqual(self.book_manager.file_handler.load_records(BookManager.JOURNAL_FILE), [])
+            snapshot = pd.read_csv(os.path.join(data_dir, "books.csv"))
+            self.assertEqual(list(snapshot["title"]), ["Book1", "Book2"])
+
+    def test_failed_checkpoint_keeps_the_journal(self):
+        with tempfile.TemporaryDirectory() as data_dir:
+            self.book_manager.file_handler = FileHandler(data_dir)
+            self.book_manager.journal_mode = True
+            self.book_manager.books = [Book("A", "Author", False, 1, "Genre", 2020)]
+            self.book_manager.checkpoint()
+            self.book_manager.add_book("B", "Author", "Genre", 2021, 1)
+            self.book_manager.add_book("C", "Author", "Genre", 2022, 1)
+
+            backend = self.book_manager.file_handler.backend
+            with patch.object(backend, "save", side_effect=OSError("disk full")):
+                self.book_manager.checkpoint()
+            self.assertEqual(len(self.book_manager.file_handler.load_records(BookManager.JOURNAL_FILE)), 2)
+
+            self.book_manager.add_book("D", "Author", "Genre", 2023, 1)
+            restarted = BookManager(journal_mode=True, file_handler=FileHandler(data_dir))
+            self.assertEqual([book.title for book in restarted.books], ["A", "B", "C", "D"])
+
+    def test_unsaved_changes_are_kept_once_per_book(self):
+        book = Book("Book1", "Author1", False, 2, "Genre1", 2020)
+        self.book_manager.books = [book]
+        self.book_manager.book_updated(book)
+        # A mocked file handler tracks no change sequences, so there is nothing to merge
+        self.assertEqual(self.book_manager._pending_records, {})
+
+        with tempfile.TemporaryDirectory() as data_dir:
+            book_manager = BookManager(file_handler=FileHandler(data_dir))
+            book_manager.books = [book]
+            with patch.object(book_manager, "_write_snapshot", return_value=False):
+                for copies_available in range(5):
+                    book.copies_available = copies_available
+                    book_manager.book_updated(book)
+                    book_manager.save_books()
+            self.assertEqual(list(book_manager._pending_records), [("Book1", "Author1")])
+            self.assertEqual(book_manager._pending_records[("Book1", "Author1")]["book"]["copies_available"], 4)
+
+    def test_group_commit_coalesces_saves(self):
+        book_manager = BookManager(derived_views="off", group_commit_changes=3)
+        book_manager.file_handler = MagicMock()
+        book_manager.books = []
+
+        book_manager.add_book("Book1", "Author1", "Genre1", 2020, 1)
+        book_manager.add_book("Book2", "Author2", "Genre2", 2021, 1)
+        self.assertEqual(book_manager.file_handler.save_csv.call_count, 0)
+        book_manager.add_book("Book3", "Author3", "Genre3", 2022, 1)
+        self.assertEqual(book_manager.file_handler.save_csv.call_count, 1)
+
+        book_manager.add_book("Book4", "Author4", "Genre4", 2023, 1)
+        book_manager.flush()
+        book_manager.flush()
+        self.assertEqual(book_manager.file_handler.save_csv.call_count, 2)
+        self.assertEqual(len(book_manager.file_handler.save_csv.call_args[0][1]), 4)
+
+    def test_group_commit_interval_writes_atomically(self):
+        with tempfile.TemporaryDirectory() as data_dir:
+            book_manager = BookManager(derived_views="off", file_handler=FileHandler(data_dir),
+                                       group_commit_interval=0.05)
+            book_manager.books = []
+            book_manager.add_book("Book1", "Author1", "Genre1", 2020, 1)
+            self.assertFalse(os.path.exists(os.path.join(data_dir, "books.csv")))
+
+            book_manager._flush_timer.join()
+            self.assertEqual(list(pd.read_csv(os.path.join(data_dir, "books.csv"))["title"]), ["Book1"])
+            # No temporary files are left behind; only the lock and change-sequence files join books.csv
+            self.assertEqual(sorted(os.listdir(data_dir)),
+                             sorted(["books.csv", FileHandler.SEQUENCE_FILE, FileHandler.LOCK_FILE]))
+            self.assertIsNone(book_manager._flush_timer)
+
+    def test_shared_catalog_per_data_directory(self):
+        with tempfile.TemporaryDirectory() as data_dir, tempfile.TemporaryDirectory() as other_dir:
+            try:
+                book_manager = BookManager.shared(data_dir)
+                self.assertIs(BookManager.shared(os.path.join(data_dir, ".")), book_manager)
+                self.assertIsNot(BookManager.shared(other_dir), book_manager)
+
+                borrowing_manager = BorrowingManager(book_manager)
+                book_manager.add_book("Book1", "Author1", "Genre1", 2020, 1)
+                self.assertTrue(borrowing_manager.borrow_book("Book1", "user1"))
+                self.assertEqual(BookManager.shared(data_dir).find_book("Book1").copies_available, 0)
+
+                BookManager.release_shared(data_dir)
+                reloaded = BookManager.shared(data_dir)
+                self.assertIsNot(reloaded, book_manager)
+                self.assertEqual(reloaded.find_book("Book1").copies_available, 0)
+            finally:
+                BookManager.release_shared()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+from classes.Book import Book
+from classes.BookManager import BookManager
+from classes.BorrowingManager import BorrowingManager
+from classes.HoldManager import HoldManager
+from classes.Logger import Logger
+
+
+class TestBorrowingManagerBulk(unittest.TestCase):
+    def setUp(self):
+        file_handler = MagicMock()
+        file_handler.load_csv.return_value = pd.DataFrame()
+        self.book_manager = BookManager(derived_views="off", file_handler=file_handler)
+        self.book_manager.books = []
+        self.book_manager.add_book("Dune", "Frank Herbert", "Science Fiction", 1965, 3)
+        self.book_manager.add_book("Emma", "Jane Austen", "Classic", 1815, 1)
+        self.borrowing_manager = BorrowingManager(self.book_manager)
+
+    def tearDown(self):
+        Logger.metrics.reset()
+
+    def test_borrow_many_saves_and_logs_once(self):
+        Logger.metrics.reset()
+        items = [("Dune", "user1"), ("Dune", "user2"), ("Emma", "user3")]
+        with patch.object(self.book_manager, "save_books") as mock_save_books:
+            result = self.borrowing_manager.borrow_many(items)
+
+        self.assertTrue(result)
+        self.assertEqual([item.message for item in result.items], ["borrowed"] * 3)
+        mock_save_books.assert_called_once()
+        self.assertEqual(self.book_manager.find_book("Dune").copies_available, 1)
+        self.assertTrue(self.book_manager.find_book("Emma").is_loaned)
+        (action, stats), = Logger.stats().items()
+        self.assertTrue(action.endswith("borrow_many"))
+        self.assertEqual(stats["calls"], 1)
+
+        result = self.borrowing_manager.return_many([("Dune", "user1"), ("Emma", "user3")])
+        self.assertTrue(result)
+        self.assertEqual(self.book_manager.find_book("Dune").copies_available, 2)
+        self.assertFalse(self.book_manager.find_book("Emma").is_loaned)
+
+    def test_bulk_operations_are_all_or_nothing(self):
+        items = [("Dune", "user1"), ("Emma", "user2"), ("Emma", "user3"), ("Missing", "user4")]
+        with patch.object(self.book_manager, "save_books") as mock_save_books:
+            result = self.borrowing_manager.borrow_many(items)
+
+        self.assertFalse(result)
+        self.assertEqual([(item.title, item.message) for item in result.failures],
+                         [("Emma", "unavailable"), ("Missing", "not found")])
+        mock_save_books.assert_not_called()
+        self.assertEqual(self.book_manager.find_book("Dune").copies_available, 3)
+        self.assertEqual(self.book_manager.find_book("Emma").copies_available, 1)
+
+        result = self.borrowing_manager.return_many([("Dune", "user1")])
+        self.assertFalse(result)
+        self.assertEqual(result.failures[0].message, "no copies on loan")
+
+    def test_error_keeps_the_results_so_far(self):
+        with patch.object(self.book_manager, "find_book", side_effect=[self.book_manager.books[0], KeyError("x")]):
+            result = self.borrowing_manager.borrow_many([("Dune", "user1"), ("Emma", "user2")])
+        self.assertFalse(result)
+        self.assertEqual(result.items, [])
+        self.assertEqual(self.book_manager.find_book("Dune").copies_available, 3)
+
+        # A failed save does not undo the applied items; the result says they are not saved yet
+        with patch.object(self.book_manager, "save_books", side_effect=OSError("disk full")):
+            result = self.borrowing_manager.borrow_many([("Dune", "user1"), ("Dune", "user2")])
+        self.assertTrue(result)
+        self.assertEqual([item.message for item in result.items], ["borrowed, not saved yet"] * 2)
+        self.assertEqual(self.book_manager.find_book("Dune").copies_available, 1)
+
+        with patch.object(self.book_manager, "save_books", side_effect=OSError("disk full")):
+            result = self.borrowing_manager.return_many([("Dune", "user1")])
+        self.assertTrue(result)
+        self.assertEqual(result.failures, [])
+        self.assertEqual(self.book_manager.find_book("Dune").copies_available, 2)
+
+    def test_returned_copies_are_held_for_waiting_users(self):
+        hold_manager = HoldManager()
+        borrowing_manager = BorrowingManager(self.book_manager, hold_manager)
+        self.assertTrue(borrowing_manager.borrow_many([("Emma", "user1")]))
+        borrowing_manager.borrow_book("Emma", "user2")
+
+        self.assertTrue(borrowing_manager.return_many([("Emma", "user1")]))
+        self.assertFalse(borrowing_manager.borrow_many([("Emma", "user3")]))
+        self.assertTrue(borrowing_manager.borrow_many([("Emma", "user2")]))
+        self.assertEqual(len(hold_manager), 0)
+
+    def test_thousands_of_items(self):
+        self.book_manager.books = [Book(f"Book{i}", "Author", False, 5, "Genre", 2000) for i in range(1000)]
+        items = [(f"Book{i % 1000}", f"student{i}") for i in range(5000)]
+
+        self.assertTrue(self.borrowing_manager.borrow_many(items))
+        self.assertTrue(all(book.copies_available == 0 for book in self.book_manager.books))
+        self.assertTrue(self.borrowing_manager.return_many(items))
+        self.assertTrue(all(book.copies_available == 5 for book in self.book_manager.books))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import random
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+from classes.BookManager import BookManager
+from classes.BorrowingManager import BorrowingManager
+
+
+class TestBorrowingManagerConcurrency(unittest.TestCase):
+    BOOKS = 20
+    COPIES = 5
+
+    def setUp(self):
+        file_handler = MagicMock()
+        file_handler.load_csv.return_value = pd.DataFrame()
+        self.book_manager = BookManager(derived_views="off", file_handler=file_handler, group_commit_changes=50)
+        for i in range(self.BOOKS):
+            self.book_manager.add_book(f"Book{i}", "Author", "Genre", 2000, self.COPIES)
+        self.borrowing_manager = BorrowingManager(self.book_manager)
+
+    def run_threads(self, threads, work):
+        start = threading.Barrier(threads)
+
+        def run(seed):
+            start.wait()
+            work(random.Random(seed))
+
+        workers = [threading.Thread(target=run, args=(seed,)) for seed in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    def test_last_copy_is_borrowed_once(self):
+        successes = [0] * self.BOOKS
+        count_lock = threading.Lock()
+        free_copies = BorrowingManager._free_copies
+
+        def slow_free_copies(manager, book, username):
+            copies = free_copies(manager, book, username)
+            time.sleep(0)  # Let other threads run between the check and the decrement
+            return copies
+
+        def work(rng):
+            for _ in range(100):
+                i = rng.randrange(self.BOOKS)
+                if self.borrowing_manager.borrow_book(f"Book{i}"):
+                    with count_lock:
+                        successes[i] += 1
+
+        with patch.object(BorrowingManager, "_free_copies", slow_free_copies):
+            self.run_threads(8, work)
+
+        for i, book in enumerate(self.book_manager.books):
+            self.assertEqual(book.copies_available, self.COPIES - successes[i])
+            self.assertGreaterEqual(book.copies_available, 0)
+            self.assertEqual(book.loaned_count, successes[i])
+        self.assertEqual(sum(successes), self.BOOKS * self.COPIES)
+
+    def test_no_lost_updates(self):
+        for threads in (1, 2, 4, 8):
+            operations = 400 // threads
+
+            def work(rng):
+                for _ in range(operations):
+                    title = f"Book{rng.randrange(self.BOOKS)}"
+                    if self.borrowing_manager.borrow_book(title):
+                        self.borrowing_manager.return_book(title)
+
+            self.run_threads(threads, work)
+
+            for book in self.book_manager.books:
+                self.assertEqual(book.copies_available, self.COPIES)
+            self.assertEqual(sum(book.loaned_count for book in self.book_manager.books),
+                             sum(book.popularity_count for book in self.book_manager.books))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -15,6 +15,7 @@ class TestBorrowingManagerWithWaitingList(unittest.TestCase):
         self.mock_book.copies_available = 0
         self.mock_book.waiting_list_manager = self.mock_waiting_list_manager
         self.mock_book_manager.books = [self.mock_book]
+        self.mock_book_manager.find_book.return_value = self.mock_book
         self.borrowing_manager = BorrowingManager()
         self.borrowing_manager.book_manager = self.mock_book_manager
 
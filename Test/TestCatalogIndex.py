@@ -0,0 +1,139 @@
+import unittest
+from unittest.mock import MagicMock
+
+from classes.Book import Book
+from classes.BookManager import BookManager
+from classes.BorrowingManager import BorrowingManager
+from classes.CatalogIndex import NGramIndex, PopularityIndex
+from classes.SearchManager import SearchManager
+from classes.SearchStrategic import parse_range
+
+
+class TestNGramIndex(unittest.TestCase):
+    def setUp(self):
+        self.book_manager = BookManager()
+        self.book_manager.file_handler = MagicMock()
+        self.book_manager.books = [
+            Book("The Great Gatsby", "F. Scott Fitzgerald", False, 2, "Classic", 1925),
+            Book("Great Expectations", "Charles Dickens", False, 1, "Classic", 1861),
+            Book("Dune", "Frank Herbert", True, 1, "Science Fiction", 1965),
+            Book("It", "Stephen King", False, 1, "Horror", 1986),
+        ]
+        self.search_manager = SearchManager(self.book_manager, MagicMock())
+
+    def titles(self, query, search_type):
+        return [book.title for book in self.search_manager.perform_search(query, search_type)]
+
+    def test_index_matches_scan(self):
+        queries = ["great", "GREAT", "at", "t", "", "ex", "Gatsby", "missing", "e g", "it"]
+        for search_type in ("title", "author", "genre"):
+            for query in queries:
+                expected = self.titles(query, search_type)
+                self.book_manager.enable_search_indexes()
+                self.assertEqual(sorted(self.titles(query, search_type)), sorted(expected), (search_type, query))
+                self.book_manager.indexes.clear()
+
+    def test_index_follows_add_and_remove(self):
+        self.book_manager.enable_search_indexes()
+        self.book_manager.add_book("Great Apes", "Will Self", "Satire", 1997, 1)
+        self.assertEqual(self.titles("great", "title"), ["The Great Gatsby", "Great Expectations", "Great Apes"])
+
+        self.book_manager.remove_book("The Great Gatsby")
+        self.assertEqual(self.titles("great", "title"), ["Great Expectations", "Great Apes"])
+        self.assertEqual(self.titles("fitz", "author"), [])
+
+    def test_update_reindexes_changed_field(self):
+        index = NGramIndex("title")
+        book = Book("Old Title", "Author", False, 1, "Genre", 2000)
+        book.book_id = 0
+        index.add(book)
+        book.title = "New Name"
+        index.update(book)
+
+        self.assertEqual(index.search("old"), [])
+        self.assertEqual(index.search("name"), [book])
+
+
+class TestSortedIndex(unittest.TestCase):
+    def setUp(self):
+        self.book_manager = BookManager()
+        self.book_manager.file_handler = MagicMock()
+        self.book_manager.books = [
+            Book("Book1950", "Author", False, 3, "Genre", 1950),
+            Book("Book1960", "Author", False, 1, "Genre", 1960),
+            Book("Book1970", "Author", True, 2, "Genre", 1970),
+            Book("Book1980", "Author", False, 5, "Genre", 1980),
+        ]
+        self.search_manager = SearchManager(self.book_manager, MagicMock())
+
+    def titles(self, query, search_type):
+        return sorted(book.title for book in self.search_manager.perform_search(query, search_type))
+
+    def test_parse_range(self):
+        self.assertEqual(parse_range("1950-1970"), (1950, 1970))
+        self.assertEqual(parse_range(">=3 copies"), (3, None))
+        self.assertEqual(parse_range(">3"), (4, None))
+        self.assertEqual(parse_range("<= 2"), (None, 2))
+        self.assertEqual(parse_range("<2"), (None, 1))
+        self.assertEqual(parse_range(1960), (1960, 1960))
+        with self.assertRaises(ValueError):
+            parse_range("recent")
+
+    def test_index_matches_scan(self):
+        queries = [("1950-1970", "year_range"), (">=3", "copies_available_range"), ("<1", "copies_available_range"),
+                   ("1960", "year"), (1975, "year"), ("0", "copies_available"), ("5", "copies_available")]
+        expected = [self.titles(query, search_type) for query, search_type in queries]
+        self.book_manager.enable_range_indexes()
+        self.assertEqual([self.titles(query, search_type) for query, search_type in queries], expected)
+        self.assertEqual(expected[0], ["Book1950", "Book1960", "Book1970"])
+
+    def test_borrow_and_return_update_copies_index(self):
+        self.book_manager.enable_range_indexes()
+        borrowing_manager = BorrowingManager()
+        borrowing_manager.book_manager = self.book_manager
+
+        borrowing_manager.borrow_book("Book1960", "user1")
+        self.assertEqual(self.titles("0", "copies_available"), ["Book1960", "Book1970"])
+        borrowing_manager.return_book("Book1970")
+        self.assertEqual(self.titles("0", "copies_available"), ["Book1960"])
+        self.assertEqual(self.titles(">=3", "copies_available_range"), ["Book1950", "Book1980"])
+
+
+class TestPopularityIndex(unittest.TestCase):
+    def setUp(self):
+        self.book_manager = BookManager()
+        self.book_manager.file_handler = MagicMock()
+        self.book_manager.books = [Book(f"Book{i}", "Author", False, 5, "Genre", 2000) for i in range(6)]
+        self.book_manager.enable_popularity_index()
+        self.borrowing_manager = BorrowingManager()
+        self.borrowing_manager.book_manager = self.book_manager
+
+    def test_borrow_updates_leaderboard(self):
+        for title in ["Book3", "Book3", "Book5", "Book1", "Book5", "Book3"]:
+            self.borrowing_manager.borrow_book(title, "user")
+        search_manager = SearchManager(self.book_manager, MagicMock(), popular_limit=4)
+
+        titles = [book.title for book in search_manager.display_books("popular")]
+        # Ties (Book0 and Book2 both have 0) are broken by book id
+        self.assertEqual(titles, ["Book3", "Book5", "Book1", "Book0"])
+
+    def test_top_matches_sorted_filter(self):
+        popularity = [4, 1, 4, 0, 2, 1]
+        for book, count in zip(self.book_manager.books, popularity):
+            book.popularity_count = count
+            self.book_manager.book_updated(book)
+        index = self.book_manager.indexes["popularity"]
+        expected = sorted(self.book_manager.books, key=lambda book: book.popularity_count, reverse=True)
+
+        self.assertEqual(index.top(6), expected)
+        self.assertEqual(index.top(2), expected[:2])
+
+    def test_removed_book_leaves_leaderboard(self):
+        self.borrowing_manager.borrow_book("Book2", "user")
+        self.book_manager.remove_book("Book2")
+        self.assertNotIn("Book2", [book.title for book in self.book_manager.indexes["popularity"].top(10)])
+        self.assertIsInstance(self.book_manager.indexes["popularity"], PopularityIndex)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+from unittest.mock import MagicMock
+
+from classes.Book import Book
+from classes.BookManager import BookManager
+from classes.BorrowingManager import BorrowingManager
+from classes.ColumnarCatalog import ColumnarCatalog
+from classes.SearchManager import SearchManager
+
+
+class TestColumnarCatalog(unittest.TestCase):
+    def setUp(self):
+        self.books = [
+            Book("Book1", "Author1", False, 3, "Fiction", 2020),
+            Book("Book2", "Author2", True, 2, "Science", 2019),
+            Book("Book3", "Author1", False, 1, "Fiction", 2018),
+        ]
+        self.catalog = ColumnarCatalog(self.books)
+
+    def test_views_match_books(self):
+        self.assertEqual(len(self.catalog), 3)
+        self.assertEqual([view.to_dict() for view in self.catalog], [book.to_dict() for book in self.books])
+        self.assertFalse(hasattr(self.catalog[0], "__dict__"))
+
+    def test_view_updates_write_through(self):
+        view = self.catalog[1]
+        view.copies_available += 1
+        view.is_loaned = False
+        view.waiting_list_manager.add_to_waiting_list("user1")
+
+        self.assertIs(self.catalog[1], view)
+        self.assertEqual(self.catalog[1].copies_available, 1)
+        self.assertTrue(self.catalog[1].is_available())
+        self.assertEqual(self.catalog[1].to_dict()["waiting_list"], "user1")
+
+    def test_delete_and_move_rows(self):
+        last = self.catalog[2]
+        self.catalog[0] = last
+        self.catalog.pop()
+
+        self.assertEqual([view.title for view in self.catalog], ["Book3", "Book2"])
+        self.assertIs(self.catalog[0], last)
+
+        del self.catalog[0]
+        self.assertEqual([view.title for view in self.catalog], ["Book2"])
+        self.assertEqual(self.catalog[0].year, 2019)
+
+    def test_deletes_leave_views_in_place_until_compaction(self):
+        catalog = ColumnarCatalog(Book(f"Book{i}", "Author", False, 1, "Genre", 2000 + i) for i in range(200))
+        survivor = catalog[199]
+        deleted = catalog[0]
+        del catalog[0]
+        self.assertEqual((survivor._row, deleted.title), (199, "Book0"))
+
+        # Odd books go; once dead rows outnumber live ones the columns are compacted
+        for position in range(98, -1, -1):
+            del catalog[2 * position]
+        self.assertEqual(len(catalog._columns["year"]), 200)
+        del catalog[0]
+        self.assertEqual([view.title for view in catalog], [f"Book{i}" for i in range(4, 200, 2)] + ["Book199"])
+        self.assertEqual([view.year for view in catalog], list(range(2004, 2200, 2)) + [2199])
+        self.assertEqual(len(catalog._columns["year"]), 99)
+        self.assertIs(catalog[-1], survivor)
+        self.assertEqual((survivor._row, survivor.title), (98, "Book199"))
+        # A deleted view still reads its own book
+        self.assertEqual((deleted.title, deleted.year), ("Book0", 2000))
+
+    def test_managers_work_on_views(self):
+        book_manager = BookManager(columnar=True)
+        book_manager.file_handler = MagicMock()
+        book_manager.books = self.books
+        self.assertIsInstance(book_manager.books, ColumnarCatalog)
+
+        borrowing_manager = BorrowingManager()
+        borrowing_manager.book_manager = book_manager
+        self.assertTrue(borrowing_manager.borrow_book("Book3", "user1"))
+        self.assertEqual(book_manager.books[2].copies_available, 0)
+
+        search_manager = SearchManager(book_manager, MagicMock())
+        titles = [book.title for book in search_manager.perform_search("author1", "author")]
+        self.assertEqual(titles, ["Book1", "Book3"])
+        available = [book.title for book in search_manager.display_books("available")]
+        self.assertEqual(available, ["Book1"])
+
+        # Removing a row leaves the views behind it reading their own books
+        self.assertTrue(book_manager.remove_book("Book1"))
+        self.assertEqual([book.title for book in book_manager.books], ["Book2", "Book3"])
+        self.assertEqual(book_manager.find_book("Book3").copies_available, 0)
+
+    def test_memory_report(self):
+        books = [Book(f"Title {i}", f"Author {i % 50}", False, 2, "Genre", 1900 + i % 100) for i in range(2000)]
+        report = ColumnarCatalog.memory_report(books)
+
+        self.assertEqual(report["books"], 2000)
+        self.assertLess(report["columnar_bytes"], report["object_bytes"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import os
+import tempfile
+import threading
+import unittest
+
+import pandas as pd
+
+from classes.BookManager import BookManager
+from classes.BorrowingManager import BorrowingManager
+from classes.FileHandler import FileHandler
+
+
+class TestFileHandler(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_handler = FileHandler(self.temp_dir.name)
+        self.backend = self.file_handler.backend
+        self.file_handler.save_csv("users.csv", pd.DataFrame({"username": ["admin"], "password_hash": ["hash"]}))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_unchanged_file_is_read_from_cache(self):
+        first = self.file_handler.load_csv("users.csv")
+        first.loc[0, "username"] = "changed"
+        second = self.file_handler.load_csv("users.csv")
+
+        self.assertEqual(list(second["username"]), ["admin"])
+        self.assertEqual((self.backend.cache_misses, self.backend.cache_hits), (1, 1))
+
+        self.file_handler.load_csv("users.csv", dtype={"username": str})
+        self.assertEqual(self.backend.cache_misses, 2)
+
+    def test_cache_invalidated_by_writes(self):
+        self.file_handler.load_csv("users.csv")
+        self.file_handler.update_file("users.csv", pd.DataFrame({"username": ["new"], "password_hash": ["other"]}))
+        self.assertEqual(list(self.file_handler.load_csv("users.csv")["username"]), ["admin", "new"])
+
+        # Written behind the handler's back
+        pd.DataFrame({"username": ["outside"], "password_hash": ["x"]}).to_csv(
+            os.path.join(self.temp_dir.name, "users.csv"), index=False)
+        self.assertEqual(list(self.file_handler.load_csv("users.csv")["username"]), ["outside"])
+        # Only update_file's reload of the unchanged file was a hit
+        self.assertEqual(self.backend.cache_hits, 1)
+
+    @unittest.skipIf(os.name == "nt", "POSIX permissions")
+    def test_saves_keep_file_permissions(self):
+        users_path = os.path.join(self.temp_dir.name, "users.csv")
+        umask = os.umask(0)
+        os.umask(umask)
+        self.assertEqual(os.stat(users_path).st_mode & 0o777, 0o666 & ~umask)
+        self.assertEqual(os.stat(self.file_handler.get_file_path(FileHandler.SEQUENCE_FILE)).st_mode & 0o777,
+                         0o666 & ~umask)
+
+        os.chmod(users_path, 0o664)
+        self.file_handler.save_csv("users.csv", pd.DataFrame({"username": ["admin2"], "password_hash": ["hash"]}))
+        self.assertEqual(os.stat(users_path).st_mode & 0o777, 0o664)
+
+    def test_lock_excludes_other_handlers(self):
+        other_handler = FileHandler(self.temp_dir.name)
+        events = []
+        locked = threading.Event()
+
+        def other_writer():
+            locked.wait()
+            with other_handler.lock():
+                events.append("other")
+
+        writer = threading.Thread(target=other_writer)
+        writer.start()
+        with self.file_handler.lock(), self.file_handler.lock():
+            locked.set()
+            writer.join(0.1)
+            events.append("first")
+        writer.join()
+        self.assertEqual(events, ["first", "other"])
+
+    def test_book_managers_see_each_others_changes(self):
+        first = BookManager(file_handler=self.file_handler)
+        first.add_book("Book1", "Author1", "Genre1", 2020, 2)
+        second = BookManager(file_handler=FileHandler(self.temp_dir.name))
+        self.assertFalse(second.refresh_if_changed())
+
+        first.find_book("Book1").copies_available = 1
+        first.book_updated(first.find_book("Book1"))
+        first.save_books()
+        self.assertFalse(first.refresh_if_changed())
+        self.assertTrue(second.refresh_if_changed())
+        self.assertEqual(second.find_book("Book1").copies_available, 1)
+        self.assertFalse(second.refresh_if_changed())
+
+        # Both change the catalog without refreshing; neither save loses the other's change
+        first.add_book("Book2", "Author2", "Genre2", 2021, 1)
+        second.add_book("Book3", "Author3", "Genre3", 2022, 1)
+        saved = pd.read_csv(os.path.join(self.temp_dir.name, "books.csv"))
+        self.assertEqual(sorted(saved["title"]), ["Book1", "Book2", "Book3"])
+        self.assertTrue(first.refresh_if_changed())
+        self.assertEqual(sorted(book.title for book in first.books), ["Book1", "Book2", "Book3"])
+
+    def test_reload_updates_books_in_place(self):
+        first = BookManager(file_handler=self.file_handler)
+        first.add_book("Book1", "Author1", "Genre1", 2020, 2)
+        first.add_book("Book2", "Author2", "Genre2", 2021, 1)
+        second = BookManager(file_handler=FileHandler(self.temp_dir.name))
+        held = second.find_book("Book1")
+        book_id = held.book_id
+
+        first.find_book("Book1").copies_available = 0
+        first.book_updated(first.find_book("Book1"))
+        first.remove_book("Book2")
+        first.add_book("Book3", "Author3", "Genre3", 2022, 1)
+
+        self.assertTrue(second.refresh_if_changed())
+        self.assertIs(second.find_book("Book1"), held)
+        self.assertEqual((held.book_id, held.copies_available), (book_id, 0))
+        self.assertEqual([book.title for book in second.books], ["Book1", "Book3"])
+        self.assertIsNone(second.find_book("Book2"))
+
+    def test_concurrent_borrows_are_merged(self):
+        for journal_mode in (False, True):
+            with self.subTest(journal_mode=journal_mode):
+                data_dir = tempfile.mkdtemp(dir=self.temp_dir.name)
+                first = BookManager(journal_mode=journal_mode, file_handler=FileHandler(data_dir))
+                first.add_book("Dune", "Frank Herbert", "Science Fiction", 1965, 3)
+                second = BookManager(journal_mode=journal_mode, file_handler=FileHandler(data_dir))
+
+                # Both take a copy from the 3 they loaded; the second save merges the first
+                for book_manager, username in ((first, "user1"), (second, "user2")):
+                    book = book_manager.find_book("Dune")
+                    with book_manager.changing(book):
+                        book.copies_available -= 1
+                        book.loaned_count += 1
+                        book.waiting_list_manager.add_to_waiting_list(username)
+                    book_manager.save_books()
+                book = second.find_book("Dune")
+                self.assertEqual((book.copies_available, book.loaned_count), (1, 2))
+                self.assertEqual(book.waiting_list_manager.get_waiting_list(), ["user1", "user2"])
+
+                third = BookManager(journal_mode=journal_mode, file_handler=FileHandler(data_dir))
+                self.assertEqual(third.find_book("Dune").copies_available, 1)
+                self.assertTrue(first.refresh_if_changed())
+                self.assertEqual(first.find_book("Dune").copies_available, 1)
+
+                # Borrowing starts from the other process's latest save
+                self.assertTrue(BorrowingManager(third).borrow_book("Dune", "user3"))
+                self.assertTrue(BorrowingManager(second).borrow_book("Dune", "user4"))
+                self.assertEqual(second.find_book("Dune").copies_available, 0)
+                self.assertEqual(second.find_book("Dune").waiting_list_manager.get_waiting_list(),
+                                 ["user1", "user2", "user4"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from classes.Book import Book
+from classes.BookManager import BookManager
+from classes.BorrowingManager import BorrowingManager
+from classes.FileHandler import FileHandler
+from classes.HoldManager import HoldManager
+from classes.WaitingListManager import WaitingListManager
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestHoldManager(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.book = Book("Dune", "Frank Herbert", False, 1, "Science Fiction", 1965)
+        self.mock_book_manager = MagicMock(spec=BookManager)
+        self.mock_book_manager.find_book.return_value = self.book
+        self.hold_manager = HoldManager(hold_seconds=60, clock=self.clock)
+        self.borrowing_manager = BorrowingManager(self.mock_book_manager, self.hold_manager)
+
+    def tearDown(self):
+        WaitingListManager.priorities = {}
+
+    def test_returned_copy_is_held_for_next_user(self):
+        self.assertTrue(self.borrowing_manager.borrow_book("Dune", "user1"))
+        self.borrowing_manager.borrow_book("Dune", "user2")
+        self.borrowing_manager.return_book("Dune")
+
+        self.assertEqual(self.hold_manager.held_copies(self.book), 1)
+        # A walk-in cannot take the held copy and joins the queue instead
+        self.borrowing_manager.borrow_book("Dune", "user3")
+        self.assertEqual(self.book.copies_available, 1)
+        self.assertEqual(self.book.waiting_list_manager.get_waiting_list(), ["user3"])
+
+        self.borrowing_manager.borrow_book("Dune", "user2")
+        self.assertEqual(self.book.copies_available, 0)
+        self.assertEqual(len(self.hold_manager), 0)
+
+    def test_expired_hold_moves_to_next_user(self):
+        self.borrowing_manager.borrow_book("Dune", "user1")
+        for username in ["user2", "user3"]:
+            self.borrowing_manager.borrow_book("Dune", username)
+        self.borrowing_manager.return_book("Dune")
+        self.mock_book_manager.save_books.reset_mock()
+
+        self.clock.now += 59
+        self.assertEqual(self.hold_manager.expire_due(), 0)
+        self.clock.now += 1
+        self.assertEqual(self.hold_manager.expire_due(), 1)
+
+        self.assertEqual(self.hold_manager.holder_deadline(self.book, "user3"), self.clock.now + 60)
+        self.assertFalse(self.borrowing_manager.hold_manager.claim(self.book, "user2"))
+        self.mock_book_manager.save_books.assert_called_once()
+
+        self.clock.now += 60
+        self.hold_manager.expire_due()
+        self.assertEqual(len(self.hold_manager), 0)
+        self.assertTrue(self.borrowing_manager.borrow_book("Dune", "user4"))
+
+    def test_expired_hold_frees_the_copy_without_the_timer(self):
+        self.borrowing_manager.borrow_book("Dune", "user1")
+        self.borrowing_manager.borrow_book("Dune", "user2")
+        self.borrowing_manager.return_book("Dune")
+
+        self.clock.now += 60
+        self.assertEqual(self.hold_manager.held_copies(self.book), 0)
+        # The walk-in gets the copy instead of queueing behind a hold nobody claimed
+        self.assertTrue(self.borrowing_manager.borrow_book("Dune", "user3"))
+        self.assertEqual(self.book.copies_available, 0)
+        self.assertEqual(self.book.waiting_list_manager.get_waiting_list(), [])
+        self.assertEqual(len(self.hold_manager), 0)
+
+    def test_many_holds_expire_in_deadline_order(self):
+        books = [Book(f"Book{i}", "Author", False, 1, "Genre", 2000) for i in range(1000)]
+        for i, book in enumerate(reversed(books)):
+            book.waiting_list_manager.add_to_waiting_list("next")
+            self.clock.now += 1
+            self.hold_manager.place(book, f"user{i}")
+
+        self.clock.now = 1000 + 60 + 500
+        self.assertEqual(self.hold_manager.expire_due(), 500)
+        self.assertEqual(self.hold_manager.holder_deadline(books[-1], "next"), self.clock.now + 60)
+        self.assertEqual(self.hold_manager.holder_deadline(books[0], "user999"), 1000 + 1000 + 60)
+
+    def test_timer_thread_expires_holds(self):
+        expired = threading.Event()
+        hold_manager = HoldManager(hold_seconds=0.01, on_change=lambda book: expired.set())
+        hold_manager.start()
+        try:
+            hold_manager.place(self.book, "user1")
+            self.assertTrue(expired.wait(2))
+            self.assertEqual(len(hold_manager), 0)
+        finally:
+            hold_manager.stop()
+
+    def test_holds_survive_restart(self):
+        with tempfile.TemporaryDirectory() as data_dir:
+            file_handler = FileHandler(data_dir)
+            hold_manager = HoldManager(hold_seconds=60, clock=self.clock, file_handler=file_handler)
+            borrowing_manager = BorrowingManager(self.mock_book_manager, hold_manager)
+            borrowing_manager.borrow_book("Dune", "user1")
+            borrowing_manager.borrow_book("Dune", "user2")
+            borrowing_manager.return_book("Dune")
+            deadline = hold_manager.holder_deadline(self.book, "user2")
+
+            restarted = HoldManager(hold_seconds=60, clock=self.clock, file_handler=file_handler)
+            borrowing_manager = BorrowingManager(self.mock_book_manager, restarted)
+            self.assertEqual(restarted.holder_deadline(self.book, "user2"), deadline)
+            self.assertEqual(restarted.held_copies(self.book), 1)
+            self.assertTrue(borrowing_manager.borrow_book("Dune", "user2"))
+            self.assertEqual(self.book.copies_available, 0)
+
+            restarted = HoldManager(hold_seconds=60, clock=self.clock, file_handler=file_handler)
+            self.assertEqual(restarted.restore(self.mock_book_manager.find_book), 0)
+
+    def test_priority_tiers(self):
+        WaitingListManager.priorities = {"prof": WaitingListManager.PRIORITY_COURSE_RESERVE}
+        waiting_list_manager = self.book.waiting_list_manager
+        waiting_list_manager.add_to_waiting_list("user1")
+        waiting_list_manager.add_to_waiting_list("user2")
+        waiting_list_manager.add_to_waiting_list("prof")
+        waiting_list_manager.add_to_waiting_list("staff", WaitingListManager.PRIORITY_STAFF)
+
+        self.assertEqual(waiting_list_manager.get_waiting_list(), ["staff", "prof", "user1", "user2"])
+        self.assertEqual(waiting_list_manager.position_of("user2"), 4)
+        self.assertEqual(waiting_list_manager.waiting_list, "staff:2,prof:1,user1,user2")
+
+        restored = WaitingListManager()
+        restored.waiting_list = waiting_list_manager.waiting_list
+        self.assertEqual(restored.remove_from_waiting_list(), "staff")
+        self.assertTrue(restored.cancel("prof"))
+        self.assertEqual(restored.position_of("user1"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+from classes.Book import Book
+from classes.BookManager import BookManager
+from classes.BorrowingManager import BorrowingManager
+from classes.FileHandler import FileHandler
+from classes.LoanLedger import LoanLedger
+
+DAY = 24 * 60 * 60
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLoanLedger(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_handler = FileHandler(self.temp_dir.name)
+        self.clock = FakeClock()
+        self.ledger = LoanLedger(self.file_handler, loan_days=14, clock=self.clock)
+        self.dune = Book("Dune", "Frank Herbert", False, 3, "Science Fiction", 1965)
+        self.emma = Book("Emma", "Jane Austen", False, 1, "Classic", 1815)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_loans_by_user_and_book(self):
+        self.ledger.record_loan(self.dune, "user1")
+        self.clock.now += DAY
+        self.ledger.record_loans([(self.emma, "user1"), (self.dune, "user2")])
+
+        self.assertEqual([loan.title for loan in self.ledger.loans_of("user1")], ["Dune", "Emma"])
+        self.assertEqual([loan.username for loan in self.ledger.loans_of_book(self.dune)], ["user1", "user2"])
+        self.assertEqual(self.ledger.loans_of("user3"), [])
+        self.assertEqual(self.ledger.loans_of("user1")[0].due, 1000 + 14 * DAY)
+
+        returned = self.ledger.record_return(self.dune, "user2")
+        self.assertEqual(returned.username, "user2")
+        self.assertEqual([loan.username for loan in self.ledger.loans_of_book(self.dune)], ["user1"])
+        # Another user's or an anonymous return does not close user1's loan
+        self.assertIsNone(self.ledger.record_return(self.dune, "user2"))
+        self.assertIsNone(self.ledger.record_return(self.dune))
+        self.assertEqual(self.ledger.record_return(self.dune, "user1").username, "user1")
+        self.assertEqual(len(self.ledger), 1)
+
+    def test_overdue_in_due_date_order(self):
+        books = [Book(f"Book{i}", "Author", False, 1, "Genre", 2000) for i in range(1000)]
+        for i, book in enumerate(books):
+            self.clock.now = 1000.0 + (999 - i)
+            self.ledger.record_loan(book, f"user{i}")
+
+        self.assertEqual(self.ledger.overdue(), [])
+        overdue = self.ledger.overdue(1000 + 14 * DAY + 10)
+        self.assertEqual([loan.title for loan in overdue], [f"Book{i}" for i in range(999, 989, -1)])
+        self.assertEqual(len(self.ledger.due_before(float("inf"))), 1000)
+
+        self.ledger.record_returns([(books[999], "user999"), (books[995], "user995"), (books[994], None)])
+        self.assertEqual(len(self.ledger.overdue(1000 + 14 * DAY + 10)), 8)
+
+    def test_reload_and_compact(self):
+        self.ledger.record_loans([(self.dune, "user1"), (self.dune, "user2"), (self.emma, "user3")])
+        self.ledger.record_return(self.dune, "user1")
+
+        reloaded = LoanLedger(self.file_handler, clock=self.clock)
+        self.assertEqual(reloaded.loans_of_book(self.dune), self.ledger.loans_of_book(self.dune))
+        self.assertEqual(len(reloaded), 2)
+
+        self.assertTrue(reloaded.compact())
+        self.assertEqual([event["event"] for event in self.file_handler.load_records(LoanLedger.LEDGER_FILE)],
+                         ["loan", "loan", "next_id"])
+        self.assertEqual(LoanLedger(self.file_handler).overdue(float("inf")), reloaded.overdue(float("inf")))
+        # New loans do not reuse the ids of closed ones, also after a reload of the compacted file
+        self.assertEqual(self.ledger.record_loan(self.emma, "user4").loan_id, 3)
+        self.assertEqual(reloaded.record_loan(self.emma, "user5").loan_id, 4)
+
+    def test_ledgers_of_two_processes(self):
+        other = LoanLedger(FileHandler(self.temp_dir.name), clock=self.clock)
+        first = self.ledger.record_loan(self.dune, "user1")
+        second = other.record_loan(self.dune, "user2")
+
+        self.assertNotEqual(first.loan_id, second.loan_id)
+        self.assertEqual([loan.username for loan in self.ledger.loans_of_book(self.dune)], ["user1", "user2"])
+        self.assertEqual(other.record_return(self.dune, "user1"), first)
+        self.assertEqual(self.ledger.loans_of("user1"), [])
+
+    def test_borrowing_manager_records_loans(self):
+        file_handler = MagicMock()
+        file_handler.load_csv.return_value = pd.DataFrame()
+        book_manager = BookManager(derived_views="off", file_handler=file_handler)
+        book_manager.books = [self.dune, self.emma]
+        borrowing_manager = BorrowingManager(book_manager, ledger=self.ledger)
+
+        self.assertTrue(borrowing_manager.borrow_book("Dune", "user1"))
+        self.assertTrue(borrowing_manager.borrow_many([("Dune", "user2"), ("Emma", "user2")]))
+        # Joining the waiting list is not a loan
+        borrowing_manager.borrow_book("Emma", "user3")
+        self.assertEqual([loan.title for loan in self.ledger.loans_of("user2")], ["Dune", "Emma"])
+        self.assertEqual(self.ledger.loans_of("user3"), [])
+
+        self.assertTrue(borrowing_manager.return_book("Dune", "user2"))
+        # Only the user a copy is on loan to can return it in bulk
+        result = borrowing_manager.return_many([("Emma", "user2"), ("Dune", "user3"), ("Dune", None)])
+        self.assertFalse(result)
+        self.assertEqual([item.message for item in result.failures], ["not on loan to user"] * 2)
+        self.assertTrue(borrowing_manager.return_many([("Emma", "user2")]))
+        self.assertEqual(self.ledger.loans_of("user2"), [])
+        self.assertEqual([loan.username for loan in self.ledger.loans_of_book(self.dune)], ["user1"])
+
+        # A copy on loan to someone else cannot be returned in their place
+        self.assertFalse(borrowing_manager.return_book("Dune", "user3"))
+        self.assertFalse(borrowing_manager.return_book("Dune"))
+        self.assertEqual(self.dune.copies_available, 2)
+
+        # A loan the ledger cannot record is not lent
+        with patch.object(self.file_handler, "append_records", return_value=False):
+            self.assertFalse(borrowing_manager.borrow_book("Emma", "user5"))
+            result = borrowing_manager.borrow_many([("Emma", "user5")])
+        self.assertFalse(result)
+        self.assertEqual(result.failures[0].message, "not recorded in the loan ledger")
+        self.assertEqual(self.emma.copies_available, 1)
+
+    def test_copies_lent_before_the_ledger_can_be_returned(self):
+        self.dune.copies_available = 1
+        self.emma.copies_available = 0
+        file_handler = MagicMock()
+        file_handler.load_csv.return_value = pd.DataFrame()
+        book_manager = BookManager(derived_views="off", file_handler=file_handler)
+        book_manager.books = [self.dune, self.emma]
+        borrowing_manager = BorrowingManager(book_manager, ledger=self.ledger)
+        self.assertTrue(borrowing_manager.borrow_book("Dune", "user1"))
+
+        # Two Dune copies were lent before the ledger; user1's loan is on record
+        self.assertTrue(borrowing_manager.return_book("Dune", "alice"))
+        self.assertTrue(borrowing_manager.return_many([("Emma", "bob"), ("Dune", "carol")]))
+        self.assertFalse(borrowing_manager.return_book("Dune", "dave"))
+        self.assertEqual([loan.username for loan in self.ledger.loans_of_book(self.dune)], ["user1"])
+        self.assertTrue(borrowing_manager.return_book("Dune", "user1"))
+        self.assertEqual((self.dune.copies_available, self.emma.copies_available), (3, 1))
+
+    def test_concurrent_returns_of_one_loan(self):
+        file_handler = MagicMock()
+        file_handler.load_csv.return_value = pd.DataFrame()
+        book_manager = BookManager(derived_views="off", file_handler=file_handler)
+        book_manager.books = [self.dune]
+        borrowing_manager = BorrowingManager(book_manager, ledger=self.ledger)
+        borrowing_manager.borrow_book("Dune", "user1")
+
+        start = threading.Barrier(2)
+        returned = []
+
+        def return_copy():
+            start.wait()
+            returned.append(borrowing_manager.return_book("Dune", "user1"))
+
+        workers = [threading.Thread(target=return_copy) for _ in range(2)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(sorted(returned), [False, True])
+        self.assertEqual(self.dune.copies_available, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
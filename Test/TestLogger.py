@@ -0,0 +1,104 @@
+import json
+import os
+import tempfile
+import unittest
+
+from classes.Logger import Logger
+
+
+class TestLogger(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.temp_dir.name, "logs.txt")
+        self.logger = Logger(self.log_file)
+
+    def tearDown(self):
+        Logger.metrics.reset()
+        Logger.shutdown()
+        Logger.log_nested = False
+        self.temp_dir.cleanup()
+
+    def read_log(self):
+        with open(self.log_file) as log_file:
+            return log_file.read().splitlines()
+
+    def test_direct_logging(self):
+        @self.logger.log_action
+        def borrow_book():
+            return True
+
+        borrow_book()
+        self.assertEqual(self.read_log(), ["book borrowed successfully"])
+
+    def test_queued_logging_flushes_on_shutdown(self):
+        Logger.enable_queue(self.log_file, batch_size=10, flush_interval=60)
+
+        @self.logger.log_action
+        def return_book(ok):
+            return ok
+
+        for i in range(25):
+            return_book(i % 2 == 0)
+        Logger.shutdown()
+
+        lines = self.read_log()
+        self.assertEqual(len(lines), 25)
+        self.assertEqual(lines[:2], ["book returned successfully", "book returned fail"])
+
+    def test_nested_calls_can_be_skipped(self):
+        @self.logger.log_action
+        def search():
+            return True
+
+        @self.logger.log_action
+        def perform_search(manager, query, search_type):
+            return search()
+
+        # Nested calls are not logged by default
+        perform_search(None, "Dune", "title")
+        self.assertEqual(self.read_log(), ['Search book "Dune" by name completed successfully'])
+
+        Logger.log_nested = True
+        perform_search(None, "Dune", "title")
+        self.assertEqual(len(self.read_log()), 3)
+
+    def test_failure_is_logged_and_raised(self):
+        @self.logger.log_action
+        def add_book():
+            raise ValueError("bad input")
+
+        with self.assertRaises(ValueError):
+            add_book()
+        self.assertEqual(self.read_log(), ["Add Book failed: bad input"])
+
+    def test_metrics_per_action(self):
+        Logger.metrics.reset()
+
+        @self.logger.log_action
+        def borrow_book(ok):
+            if ok is None:
+                raise ValueError("no book")
+            return ok
+
+        for ok in [True, True, False, True]:
+            borrow_book(ok)
+        with self.assertRaises(ValueError):
+            borrow_book(None)
+
+        self.assertEqual(len(Logger.stats()), 1)
+        action, stats = next(iter(Logger.stats().items()))
+        self.assertTrue(action.endswith("borrow_book"))
+        self.assertEqual(stats["calls"], 5)
+        self.assertEqual(stats["failures"], 1)
+        self.assertEqual(stats["errors"], 1)
+        self.assertLessEqual(stats["p50_ms"], stats["p99_ms"])
+        self.assertLessEqual(stats["p99_ms"], stats["max_ms"])
+
+        stats_file = os.path.join(self.temp_dir.name, "stats.json")
+        Logger.export_stats(stats_file)
+        with open(stats_file) as exported:
+            self.assertEqual(json.load(exported), Logger.stats())
+
+
+if __name__ == "__main__":
+    unittest.main()
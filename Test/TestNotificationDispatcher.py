@@ -0,0 +1,96 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from classes.NotificationDispatcher import NotificationDispatcher, NotificationSink, FileSink
+from classes.WaitingListManager import WaitingListManager
+
+
+class FlakySink(NotificationSink):
+    def __init__(self, failures):
+        self.failures = failures
+        self.batches = []
+
+    def deliver(self, notifications):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("gateway down")
+        self.batches.append(list(notifications))
+
+
+class BlockingSink(NotificationSink):
+    def __init__(self):
+        self.release = threading.Event()
+
+    def deliver(self, notifications):
+        self.release.wait()
+
+
+class TestNotificationDispatcher(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        WaitingListManager.dispatcher = None
+        self.temp_dir.cleanup()
+
+    def test_return_path_only_enqueues(self):
+        sink_file = os.path.join(self.temp_dir.name, "notifications.txt")
+        dispatcher = NotificationDispatcher(FileSink(sink_file), workers=2, batch_size=10)
+        WaitingListManager.dispatcher = dispatcher
+        waiting_list_manager = WaitingListManager()
+        waiting_list_manager.add_to_waiting_list("user1")
+        waiting_list_manager.add_to_waiting_list("user2")
+
+        self.assertEqual(waiting_list_manager.remove_from_waiting_list(), "user1")
+        dispatcher.close()
+
+        with open(sink_file, encoding="utf-8") as notifications:
+            lines = sorted(notifications.read().splitlines())
+        self.assertEqual(lines, ["user1\tThe book is now available for user1.",
+                                 "user2\tThe book is now available for user1."])
+        self.assertEqual(dispatcher.stats()["delivered"], 2)
+
+    def test_failed_batches_are_retried(self):
+        sink = FlakySink(failures=2)
+        dispatcher = NotificationDispatcher(sink, workers=1, max_retries=3, backoff=0.001)
+        for i in range(3):
+            dispatcher.notify(f"user{i}", "ready")
+        dispatcher.close()
+
+        self.assertEqual(sum(len(batch) for batch in sink.batches), 3)
+        self.assertEqual(dispatcher.stats()["retries"], 2)
+        self.assertEqual(dispatcher.stats()["failed"], 0)
+
+        dispatcher = NotificationDispatcher(FlakySink(failures=10), workers=1, max_retries=1, backoff=0.001)
+        dispatcher.notify("user1", "ready")
+        dispatcher.flush()
+        self.assertEqual(dispatcher.stats()["failed"], 1)
+        dispatcher.close()
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        sink = BlockingSink()
+        dispatcher = NotificationDispatcher(sink, workers=1, max_queue=2, batch_size=1)
+        results = [dispatcher.notify(f"user{i}", "ready") for i in range(10)]
+        sink.release.set()
+        dispatcher.close()
+
+        self.assertFalse(all(results))
+        self.assertEqual(dispatcher.stats()["dropped"], results.count(False))
+
+    def test_notify_after_close_is_dropped(self):
+        sink = FlakySink(failures=0)
+        dispatcher = NotificationDispatcher(sink, workers=2)
+        dispatcher.notify("user1", "ready")
+        dispatcher.close()
+
+        self.assertFalse(dispatcher.notify("user2", "ready"))
+        dispatcher.flush()
+        dispatcher.close()
+        self.assertEqual([n.username for batch in sink.batches for n in batch], ["user1"])
+        self.assertEqual(dispatcher.stats()["dropped"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
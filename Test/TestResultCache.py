@@ -0,0 +1,101 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from classes.Book import Book
+from classes.BookManager import BookManager
+from classes.BorrowingManager import BorrowingManager
+from classes.ResultCache import ResultCache
+from classes.SearchManager import SearchManager
+
+
+class TestResultCache(unittest.TestCase):
+    def test_lru_eviction_and_stats(self):
+        cache = ResultCache(max_entries=2)
+        cache.put("a", 1, [1])
+        cache.put("b", 1, [2])
+        self.assertEqual(cache.get("a", 1), [1])
+        cache.put("c", 1, [3])  # Evicts "b", the least recently used
+
+        self.assertIsNone(cache.get("b", 1))
+        self.assertEqual(cache.get("c", 1), [3])
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(cache.stats()["hits"], 2)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_version_change_invalidates(self):
+        cache = ResultCache()
+        cache.put("a", 1, [1])
+        self.assertIsNone(cache.get("a", 2))
+        self.assertEqual(cache.stats()["invalidations"], 1)
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_ttl_and_byte_cap(self):
+        now = [0.0]
+        cache = ResultCache(ttl=10, clock=lambda: now[0])
+        cache.put("a", 1, [1])
+        now[0] = 11.0
+        self.assertIsNone(cache.get("a", 1))
+
+        small = ResultCache(max_bytes=200)
+        small.put("a", 1, list(range(10)))
+        small.put("b", 1, list(range(10)))
+        self.assertEqual(small.stats()["entries"], 1)
+        self.assertLessEqual(small.stats()["bytes"], 200)
+
+    def test_shared_between_threads(self):
+        cache = ResultCache(max_entries=8)
+        start = threading.Barrier(4)
+
+        def work(seed):
+            start.wait()
+            for i in range(2000):
+                key = (seed * i) % 16
+                if cache.get(key, i // 500) is None:
+                    cache.put(key, i // 500, [key])
+
+        workers = [threading.Thread(target=work, args=(seed,)) for seed in range(1, 5)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        stats = cache.stats()
+        self.assertEqual(stats["hits"] + stats["misses"], 4 * 2000)
+        self.assertLessEqual(stats["entries"], 8)
+        self.assertEqual(stats["bytes"], sum(entry[1] for entry in cache._entries.values()))
+
+
+class TestSearchManagerCache(unittest.TestCase):
+    def setUp(self):
+        self.book_manager = BookManager()
+        self.book_manager.file_handler = MagicMock()
+        self.book_manager.books = [
+            Book("Book1", "Author1", False, 1, "Fiction", 2020),
+            Book("Book2", "Author2", False, 2, "Science", 2019),
+        ]
+        self.cache = ResultCache()
+        self.search_manager = SearchManager(self.book_manager, MagicMock(), cache=self.cache)
+
+    def test_repeated_queries_hit_cache(self):
+        with patch("classes.SearchStrategic.TitleStrategic._perform_search", return_value=[]) as search:
+            self.search_manager.perform_search("book", "title")
+            self.search_manager.perform_search("book", "title")
+        self.assertEqual(search.call_count, 1)
+
+        self.search_manager.display_books("available")
+        self.search_manager.display_books("available")
+        self.assertEqual(self.cache.stats()["hits"], 2)
+
+    def test_borrow_invalidates_cached_results(self):
+        borrowing_manager = BorrowingManager()
+        borrowing_manager.book_manager = self.book_manager
+
+        self.assertEqual(len(list(self.search_manager.display_books("available"))), 2)
+        borrowing_manager.borrow_book("Book1", "user1")
+        titles = [book.title for book in self.search_manager.display_books("available")]
+
+        self.assertEqual(titles, ["Book2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
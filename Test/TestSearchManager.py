@@ -82,6 +82,28 @@ class TestSearch(unittest.TestCase):
         titles = [book.title for book in results]
         self.assertEqual(titles, ["Book A", "Book C"])
 
+    def test_popularity_index_enabled_later_is_used(self):
+        """The popular display uses an index enabled after the SearchManager was created."""
+        self.book_manager.indexes = {}
+        titles = [book.title for book in self.search_manager.display_books(filter_type="popular")]
+        self.assertEqual(titles, ["Book A", "Book C", "Book B", "Book D"])
+
+        index = Mock()
+        index.top.return_value = [self.books[3]]
+        self.book_manager.indexes["popularity"] = index
+        titles = [book.title for book in self.search_manager.display_books(filter_type="popular")]
+        self.assertEqual(titles, ["Book D"])
+        index.top.assert_called_once_with(10)
+
+    def test_lazy_results_ignore_later_catalog_changes(self):
+        """Results read after a swap-delete neither skip nor repeat books."""
+        results = self.search_manager.perform_search("Book", "title")
+        filtered = self.search_manager.display_books(filter_type="all")
+        self.books[0] = self.books.pop()
+        titles = [book.title for book in results]
+        self.assertEqual(titles, ["Book A", "Book B", "Book C", "Book D"])
+        self.assertEqual(len(filtered), 4)
+
     def test_invalid_filter_type(self):
         """Test handling of an invalid filter type."""
         with self.assertRaises(ValueError):
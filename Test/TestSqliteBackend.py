@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+from classes.AuthManager import AuthManager
+from classes.BookManager import BookManager
+from classes.BorrowingManager import BorrowingManager
+from classes.FileHandler import FileHandler
+from classes.SearchManager import SearchManager
+from classes.StorageBackend import SqliteBackend
+
+
+class TestSqliteBackend(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = self.temp_dir.name
+        pd.DataFrame({
+            "title": ["Dune", "Emma", "Ulysses"],
+            "author": ["Frank Herbert", "Jane Austen", "James Joyce"],
+            "is_loaned": [False, False, True],
+            "copies": [2, 1, 1],
+            "genre": ["Science Fiction", "Classic", "Classic"],
+            "year": [1965, 1815, 1922],
+        }).to_csv(os.path.join(self.data_dir, "books.csv"), index=False)
+        pd.DataFrame({"username": ["admin"], "password_hash": ["hash"]}).to_csv(
+            os.path.join(self.data_dir, "users.csv"), index=False)
+        self.backend = SqliteBackend(os.path.join(self.data_dir, "library.db"))
+        self.file_handler = FileHandler(self.data_dir, backend=self.backend)
+
+    def tearDown(self):
+        self.backend.close()
+        self.temp_dir.cleanup()
+
+    def test_migration_and_load(self):
+        self.assertEqual(self.backend.migrate_from_csv(self.data_dir), {"books.csv": 3, "users.csv": 1})
+        self.assertEqual(self.backend.migrate_from_csv(self.data_dir), {})
+
+        book_manager = BookManager(file_handler=self.file_handler)
+        self.assertEqual([book.title for book in book_manager.books], ["Dune", "Emma", "Ulysses"])
+        self.assertTrue(book_manager.find_book("Ulysses").is_loaned)
+
+        auth_manager = AuthManager(file_handler=self.file_handler)
+        self.assertEqual(list(auth_manager.load_users()["username"]), ["admin"])
+
+    def test_row_level_updates_in_journal_mode(self):
+        self.backend.migrate_from_csv(self.data_dir)
+        book_manager = BookManager(journal_mode=True, file_handler=self.file_handler)
+        borrowing_manager = BorrowingManager()
+        borrowing_manager.book_manager = book_manager
+
+        borrowing_manager.borrow_book("Dune", "user1")
+        book_manager.add_book("Persuasion", "Jane Austen", "Classic", 1817, 2)
+        book_manager.remove_book("Ulysses")
+
+        rows = {row["title"]: row for row in self.file_handler.search_rows("books.csv", "year", low=0)}
+        self.assertEqual(set(rows), {"Dune", "Emma", "Persuasion"})
+        self.assertEqual(rows["Dune"]["copies_available"], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.data_dir, BookManager.JOURNAL_FILE)))
+
+        reloaded = BookManager(file_handler=self.file_handler)
+        self.assertEqual(sorted(book.title for book in reloaded.books), ["Dune", "Emma", "Persuasion"])
+
+    def test_sql_search_matches_strategies(self):
+        self.backend.migrate_from_csv(self.data_dir)
+        book_manager = BookManager(journal_mode=True, file_handler=self.file_handler)
+        search_manager = SearchManager(book_manager, MagicMock())
+        queries = [("a", "title"), ("JANE", "author"), ("classic", "genre"), ("1965", "year"),
+                   ("1800-1930", "year_range"), (">=1", "copies_available_range")]
+        expected = [sorted(b.title for b in search_manager.perform_search(q, t)) for q, t in queries]
+
+        book_manager.enable_sql_search()
+        # Its own snapshot is not mistaken for another process's change
+        self.assertFalse(book_manager.refresh_if_changed())
+        actual = [sorted(b.title for b in search_manager.perform_search(q, t)) for q, t in queries]
+
+        self.assertEqual(actual, expected)
+        self.assertEqual(expected[1], ["Emma"])
+
+    def test_update_file_upserts_rows(self):
+        self.backend.migrate_from_csv(self.data_dir)
+        self.file_handler.update_file("users.csv", pd.DataFrame({"username": ["admin", "new"],
+                                                                 "password_hash": ["hash", "other"]}))
+        self.assertEqual(sorted(self.file_handler.load_csv("users.csv")["username"]), ["admin", "new"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -78,6 +78,64 @@ class TestWaitingListManager(unittest.TestCase):
         self.assertIn("Test Message", mock_observer1.messages)
         self.assertIn("Test Message", mock_observer2.messages)
 
+    def test_position_and_cancel(self):
+        for username in ["user1", "user2", "user3", "user4"]:
+            self.waiting_list_manager.add_to_waiting_list(username)
+
+        self.assertEqual(self.waiting_list_manager.position_of("user3"), 3)
+        self.assertTrue(self.waiting_list_manager.cancel("user2"))
+        self.assertFalse(self.waiting_list_manager.cancel("user2"))
+        self.assertIsNone(self.waiting_list_manager.position_of("user2"))
+        self.assertEqual(self.waiting_list_manager.position_of("user3"), 2)
+        self.assertEqual(len(self.waiting_list_manager.observers), 3)
+
+        self.waiting_list_manager.add_to_waiting_list("user2")
+        self.assertEqual(self.waiting_list_manager.get_waiting_list(), ["user1", "user3", "user4", "user2"])
+        self.assertEqual(self.waiting_list_manager.remove_from_waiting_list(), "user1")
+        self.assertEqual(self.waiting_list_manager.remove_from_waiting_list(), "user3")
+        self.assertEqual(self.waiting_list_manager.position_of("user2"), 2)
+
+    def test_many_cancellations_keep_order(self):
+        usernames = [f"user{i}" for i in range(200)]
+        for username in usernames:
+            self.waiting_list_manager.add_to_waiting_list(username)
+        for username in usernames[::3]:
+            self.waiting_list_manager.cancel(username)
+        for username in usernames[1::3]:
+            self.waiting_list_manager.cancel(username)
+
+        remaining = usernames[2::3]
+        self.assertEqual(self.waiting_list_manager.get_waiting_list(), remaining)
+        self.assertEqual([self.waiting_list_manager.position_of(u) for u in remaining],
+                         list(range(1, len(remaining) + 1)))
+
+        # Dequeue past the tombstones while cancelling further back
+        expected = list(remaining)
+        for i in range(40):
+            self.assertEqual(self.waiting_list_manager.remove_from_waiting_list(), expected.pop(0))
+            if i % 2 == 0:
+                self.waiting_list_manager.cancel(expected.pop(-2))
+        self.assertEqual(self.waiting_list_manager.get_waiting_list(), expected)
+        self.assertEqual([self.waiting_list_manager.position_of(u) for u in expected],
+                         list(range(1, len(expected) + 1)))
+
+    def test_waiting_list_string_compatibility(self):
+        self.waiting_list_manager.waiting_list = "user1,user2,user1"
+        self.assertEqual(self.waiting_list_manager.waiting_list, "user1,user2")
+        self.assertEqual(self.waiting_list_manager.remove_from_waiting_list(), "user1")
+        self.assertEqual(self.waiting_list_manager.waiting_list, "user2")
+
+    def test_waiting_list_escapes_separators(self):
+        for username in ["user:1", "a,b", "50%"]:
+            self.waiting_list_manager.add_to_waiting_list(username)
+        self.waiting_list_manager.add_to_waiting_list("staff:2", WaitingListManager.PRIORITY_STAFF)
+
+        restored = WaitingListManager()
+        restored.waiting_list = self.waiting_list_manager.waiting_list
+        self.assertEqual(restored.get_waiting_list(), ["staff:2", "user:1", "a,b", "50%"])
+        self.assertEqual(restored.position_of("user:1"), 2)
+        self.assertEqual(restored.waiting_list, self.waiting_list_manager.waiting_list)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -5,9 +5,13 @@ from classes.Logger import Logger
 
 
 class AuthManager:
-    def __init__(self, user_file="users.csv"):
-        self.file_handler = FileHandler()
+    def __init__(self, user_file="users.csv", file_handler=None):
+        self.file_handler = file_handler if file_handler is not None else FileHandler()
         self.user_file = user_file
+        # username -> password hash, see _user_index()
+        self._users = None
+        self._users_source = None
+        self._users_signature = None
         self.initialize_default_user()
 
     def hash_password(self, password):
@@ -52,37 +56,85 @@ class AuthManager:
         except Exception as e:
             print(f"Error saving users: {e}")
 
+    def _user_index(self):
+        """Return the username -> password hash dict, reloading it only when the users file changed."""
+        signature = self.file_handler.signature(self.user_file)
+        if (self._users is None or self._users_source is not self.file_handler
+                or signature is None or signature != self._users_signature):
+            users = self.load_users()
+            self._users = dict(zip(users["username"].astype(str), users["password_hash"]))
+            self._users_source = self.file_handler
+            self._users_signature = signature
+        return self._users
+
+    def _append_users(self, new_users):
+        """Append {username: password hash} to the users file and the index."""
+        users = self._user_index()
+        new_users_df = pd.DataFrame({"username": list(new_users), "password_hash": list(new_users.values())})
+        if not self.file_handler.append_csv(self.user_file, new_users_df):
+            return False
+        users.update(new_users)
+        # Our own append must not force a reload of the whole file
+        self._users_signature = self.file_handler.signature(self.user_file)
+        return True
+
     @Logger().log_action
     def register(self, username, password):
         """Register a new user."""
-        users = self.load_users()  # Load existing users
-
         # Check if the username already exists
-        if username in users["username"].values:
+        if username in self._user_index():
             return "Registration failed: Username already exists."
 
-        # Add the new user
-        new_user = pd.DataFrame([{
-            "username": username,
-            "password_hash": self.hash_password(password),
-        }])
-        updated_users = pd.concat([users, new_user], ignore_index=True)
-        print(f"Updated users: {updated_users}")
-
-        # Save the updated DataFrame
-        self.save_users(updated_users)
+        # Append the new user
+        if not self._append_users({username: self.hash_password(password)}):
+            return "Registration failed: Could not save the user."
 
         return "Registration successful."
 
+    @Logger().log_action
+    def import_users(self, csv_path):
+        """
+        Register every user of a CSV file with a username column and either a
+        password or a password_hash column, in one write. Existing and
+        duplicate usernames are skipped. Returns the number of users added.
+        """
+        try:
+            data = pd.read_csv(csv_path, dtype=str)
+        except Exception as e:
+            print(f"Error reading {csv_path}: {e}")
+            return 0
+        if "username" not in data.columns or not {"password", "password_hash"} & set(data.columns):
+            print(f"{csv_path} needs a username column and a password or password_hash column.")
+            return 0
+
+        users = self._user_index()
+        new_users = {}
+        for row in data.to_dict("records"):
+            username = row["username"]
+            if not isinstance(username, str) or not username.strip():
+                continue
+            username = username.strip()
+            if username in users or username in new_users:
+                continue
+            password_hash = row.get("password_hash")
+            if not isinstance(password_hash, str):
+                password = row.get("password")
+                if not isinstance(password, str):
+                    continue
+                password_hash = self.hash_password(password)
+            new_users[username] = password_hash
+
+        print(f"Importing {len(new_users)} of {len(data)} users from {csv_path}.")
+        if new_users and not self._append_users(new_users):
+            return 0
+        return len(new_users)
+
     @Logger().log_action
     def login(self, username, password):
         """Log in an existing user."""
-        users = self.load_users()
+        stored_password = self._user_index().get(username)
 
-        if username in users["username"].values:
-            hashed_password = self.hash_password(password)
-            stored_password = users.loc[users["username"] == username, "password_hash"].iloc[0]
-            if hashed_password == stored_password:
-                return "Login successful."
+        if stored_password is not None and self.hash_password(password) == stored_password:
+            return "Login successful."
 
         return "Login failed: Invalid username or password."
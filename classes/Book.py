@@ -12,14 +12,32 @@ class Book:
         self.loaned_count = self.copies if self.is_loaned else 0
         self.copies_available = 0 if is_loaned else copies
         self.popularity_count= self.loaned_count
-        self._waiting_list_manager = None
+        self.book_id = None  # Assigned by BookManager
+        self._waiting_list_manager = None  # None, a saved waiting_list string, or the manager
 
     @property
     def waiting_list_manager(self):
-        """Lazy initialization for the waiting list manager."""
-        if self._waiting_list_manager is None:
-            self._waiting_list_manager = WaitingListManager()
-        return self._waiting_list_manager
+        """Lazy initialization for the waiting list manager, restoring a saved waiting list on first use."""
+        manager = self._waiting_list_manager
+        if not isinstance(manager, WaitingListManager):
+            saved_waiting_list = manager
+            manager = WaitingListManager()
+            if saved_waiting_list:
+                manager.waiting_list = saved_waiting_list
+            self._waiting_list_manager = manager
+        return manager
+
+    @property
+    def waiting_list(self):
+        """The waiting list as a comma-separated string, without creating a manager."""
+        manager = self._waiting_list_manager
+        if isinstance(manager, WaitingListManager):
+            return manager.waiting_list
+        return manager or ""
+
+    @waiting_list.setter
+    def waiting_list(self, value):
+        self._waiting_list_manager = value if isinstance(value, str) and value else None
 
 
 
@@ -37,6 +55,16 @@ class Book:
 
 
 
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a book, including its counters and waiting list, from to_dict() output."""
+        book = cls(data["title"], data["author"], data["is_loaned"], data["copies"], data["genre"], data["year"])
+        book.loaned_count = data.get("loaned_count", book.loaned_count)
+        book.copies_available = data.get("copies_available", book.copies_available)
+        book.popularity_count = data.get("popularity_count", book.popularity_count)
+        book.waiting_list = data.get("waiting_list")
+        return book
+
     def to_dict(self):
         """Convert the book object to a dictionary for DataFrame compatibility."""
         return {
@@ -47,7 +75,7 @@ class Book:
             "genre": self.genre,
             "year": self.year,
             "loaned_count": self.loaned_count,
-            "waiting_list": self.waiting_list_manager.waiting_list,
+            "waiting_list": self.waiting_list,
             "copies_available": self.copies_available,
             "popularity_count":self.popularity_count
         }
@@ -55,6 +83,6 @@ class Book:
     def __str__(self):
         return (f"Title: {self.title}, Author: {self.author}, Year: {self.year}, "
                 f"Genre: {self.genre}, Copies: {self.copies}, Loaned: {self.is_loaned}, "
-                f"Waiting List: {self.waiting_list_manager.waiting_list}")
+                f"Waiting List: {self.waiting_list}")
 
 
@@ -7,24 +7,33 @@ class BookFilter(ABC):
 
 class AllBooksFilter(BookFilter):
     def filter(self, books):
-        return books
+        return list(books)
 
 class PopularBooksFilter(BookFilter):
+    def __init__(self, limit=10, index=None):
+        self.limit = limit
+        self.index = index  # Optional PopularityIndex
+
     def filter(self, books):
+        if self.index is not None:
+            return self.index.top(self.limit)
         sorted_books = sorted(books, key=lambda book: book.popularity_count, reverse=True)
-        return sorted_books[:10]
+        return sorted_books[:self.limit]
 
 class AvailableBooksFilter(BookFilter):
     def filter(self, books):
-        return [book for book in books if book.copies_available > 0]
+        return (book for book in list(books) if book.copies_available > 0)
 
 class LoanedBooksFilter(BookFilter):
     def filter(self, books):
-        return [book for book in books if book.is_loaned]
+        return (book for book in list(books) if book.is_loaned)
 
 class RecentBooksFilter(BookFilter):
-    def __init__(self, year):
+    def __init__(self, year, index=None):
         self.year = year
+        self.index = index  # Optional SortedIndex on year
 
     def filter(self, books):
-        return [book for book in books if book.year >= self.year]
+        if self.index is not None:
+            return self.index.range(low=self.year)
+        return (book for book in list(books) if book.year >= self.year)
@@ -1,14 +1,37 @@
 class BookIterator:
+    """
+    Iterates over books from a list or, lazily, from any iterable such as a
+    generator: items are pulled only as far as they are read, so the first
+    page of a large result set does not require evaluating the rest.
+    """
+
     def __init__(self, books):
         if books is None:
             books = []
-        self.books = books
+        if isinstance(books, (list, tuple)):
+            self.books = books
+            self._source = None
+        else:
+            self.books = []
+            self._source = iter(books)
         self.index = 0
 
+    def _fill(self, count=None):
+        """Pull from the lazy source until `count` books are available (None pulls everything)."""
+        if self._source is None:
+            return
+        while count is None or len(self.books) < count:
+            try:
+                self.books.append(next(self._source))
+            except StopIteration:
+                self._source = None
+                return
+
     def __iter__(self):
         return self
 
     def __next__(self):
+        self._fill(self.index + 1)
         if self.index < len(self.books):
             book = self.books[self.index]
             self.index += 1
@@ -17,7 +40,33 @@ class BookIterator:
             raise StopIteration
 
     def __len__(self):
+        self._fill()
         return len(self.books)
 
+    def __bool__(self):
+        self._fill(1)
+        return len(self.books) > 0
+
     def __getitem__(self, index):
+        if isinstance(index, int) and index >= 0:
+            self._fill(index + 1)
+        else:
+            self._fill()
         return self.books[index]
+
+    def page(self, offset=0, limit=20):
+        """Return up to `limit` books starting at `offset`."""
+        self._fill(offset + limit)
+        return self.books[offset:offset + limit]
+
+    def fetch(self, cursor=None, limit=20):
+        """
+        Cursor-based paging: returns (books, next_cursor), where next_cursor
+        is None once the results are exhausted. Pass it back to resume.
+        """
+        offset = int(cursor) if cursor else 0
+        books = self.page(offset, limit)
+        end = offset + len(books)
+        self._fill(end + 1)
+        next_cursor = str(end) if len(self.books) > end else None
+        return books, next_cursor
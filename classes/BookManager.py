@@ -1,31 +1,258 @@
+import atexit
+import os
+import threading
+from bisect import bisect_left
+from contextlib import ExitStack, contextmanager
+from operator import attrgetter
 from classes.FileHandler import FileHandler
 from classes.Logger import Logger
 from classes.Book import Book
+from classes.ColumnarCatalog import ColumnarCatalog
+from classes.CatalogIndex import NGramIndex, SortedIndex, PopularityIndex, MembershipIndex, SqlSearchIndex
 import pandas as pd
 
 
 class BookManager:
-    def __init__(self):
-        self.file_handler = FileHandler()
+    JOURNAL_FILE = "books.journal"
+    # Files the catalog is read from; changes to them by other processes trigger a reload
+    WATCHED_FILES = ("books.csv", JOURNAL_FILE)
+    BOOK_DTYPES = {"title": str, "author": str, "genre": str, "is_loaned": str, "waiting_list": str}
+    BOOK_COLUMNS = ["title", "author", "is_loaned", "copies", "genre", "year",
+                    "loaned_count", "waiting_list", "copies_available", "popularity_count"]
+    VIEW_FILES = {"loaned": "loaned_books.csv", "available": "available_books.csv"}
+    # Fields an upsert copies onto the stored book; title and author identify it
+    BOOK_STATE = ("is_loaned", "copies", "genre", "year", "loaned_count", "copies_available", "popularity_count")
+    # Fields merged as differences when another process changed the same book, see _merge_row()
+    COUNTERS = ("copies", "copies_available", "loaned_count", "popularity_count")
+    LOCK_STRIPES = 64
+    # One shared catalog per data directory, see shared()
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, journal_mode=False, checkpoint_interval=1000, columnar=False, derived_views="always",
+                 file_handler=None, group_commit_interval=None, group_commit_changes=None):
+        """
+        In journal mode every mutation is appended to books.journal instead of
+        rewriting the CSV files; the journal is replayed on startup and folded
+        back into books.csv every `checkpoint_interval` records. With a
+        row-capable backend (SQLite) the changed rows are written directly instead.
+        With `columnar` the catalog is kept in a ColumnarCatalog instead of a list of Book objects.
+        `derived_views` controls loaned_books.csv and available_books.csv:
+        "always" (every save), "checkpoint" (only on checkpoint()),
+        "lazy" (only through export_view()) or "off".
+        With group commit, save_books() only marks the catalog dirty; it is
+        persisted at most every `group_commit_interval` seconds, after
+        `group_commit_changes` saves, on flush() and at interpreter exit.
+        """
+        self.file_handler = file_handler if file_handler is not None else FileHandler()
+        self.journal_mode = journal_mode
+        self.checkpoint_interval = checkpoint_interval
+        self.columnar = columnar
+        self.derived_views = derived_views
+        self.group_commit_interval = group_commit_interval
+        self.group_commit_changes = group_commit_changes
+        # Lock order: _save_lock -> book locks -> file_handler.lock() -> _lock. _lock guards the
+        # in-memory catalog and is never held while writing files; saves never start under a book lock
+        self._lock = threading.RLock()
+        self._save_lock = threading.RLock()
+        self._book_locks = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
+        self._dirty_changes = 0
+        self._flush_timer = None
+        if group_commit_interval is not None or group_commit_changes is not None:
+            atexit.register(self.flush)
+        # (title, author) -> the latest change not written yet, one per book
+        self._pending_records = {}
+        self._journal_length = 0
+        self.indexes = {}
+        if derived_views != "off":
+            # Membership of the derived views is maintained incrementally, like any other index
+            self.indexes["loaned"] = MembershipIndex(lambda book: book.copies_available == 0)
+            self.indexes["available"] = MembershipIndex(lambda book: book.copies_available > 0)
+        self.version = 0  # Bumped on every catalog change; keys SearchManager's result cache
+        self._seen_sequences = (self.file_handler, self._change_sequences())
         self.books = self.load_books()
+        if self.journal_mode:
+            self.replay_journal()
+
+    @classmethod
+    def shared(cls, data_dir="data", **options):
+        """
+        Return the BookManager for data_dir, loading it on first use, so every
+        manager and window works on the same catalog. `options` are passed to
+        the constructor and only apply to that first call.
+        """
+        key = os.path.abspath(data_dir)
+        with cls._shared_lock:
+            book_manager = cls._shared.get(key)
+            if book_manager is None:
+                options.setdefault("file_handler", FileHandler(key))
+                book_manager = cls(**options)
+                cls._shared[key] = book_manager
+        return book_manager
+
+    @classmethod
+    def release_shared(cls, data_dir=None):
+        """Forget the shared catalog of data_dir (all of them by default); the next shared() reloads it."""
+        with cls._shared_lock:
+            if data_dir is None:
+                cls._shared.clear()
+            else:
+                cls._shared.pop(os.path.abspath(data_dir), None)
+
+    @property
+    def books(self):
+        return self._books
+
+    @books.setter
+    def books(self, books):
+        if self.columnar and not isinstance(books, ColumnarCatalog):
+            books = ColumnarCatalog(books)
+        self._books = books
+        self._reindex()
+
+    def _reindex(self):
+        """
+        Rebuild the id, title and (title, author) indexes. Ids ascend with the
+        catalog order: new books, and books out of order, get the next id.
+        """
+        self.version = getattr(self, "version", 0) + 1
+        self._by_id = {}
+        self._by_title = {}
+        self._by_key = {}
+        last_id = -1
+        for book in self._books:
+            if book.book_id is None or book.book_id <= last_id:
+                book.book_id = last_id + 1
+            last_id = book.book_id
+            self._index_book(book)
+        self._next_id = last_id + 1
+        for index in self.indexes.values():
+            index.rebuild(self._books)
+
+    def _index_book(self, book):
+        self._by_id[book.book_id] = book
+        self._by_title.setdefault(book.title, []).append(book)
+        self._by_key.setdefault((book.title, book.author), book)
+
+    def _insert_book(self, book):
+        """Append a book to the catalog and its indexes; returns the stored book."""
+        self.version += 1
+        book.book_id = self._next_id
+        self._next_id += 1
+        self._books.append(book)
+        book = self._books[-1]
+        self._index_book(book)
+        for index in self.indexes.values():
+            index.add(book)
+        return book
+
+    def _delete_book(self, book):
+        """
+        Remove a book without disturbing the order of the others, so scans,
+        books.csv and the id-ordered indexes agree: its slot is found by a
+        binary search on the ascending ids and the list closes the gap.
+        """
+        self.version += 1
+        position = bisect_left(self._books, book.book_id, key=attrgetter("book_id"))
+        del self._by_id[book.book_id]
+        same_title = self._by_title[book.title]
+        same_title.remove(book)
+        if not same_title:
+            del self._by_title[book.title]
+        if self._by_key.get((book.title, book.author)) is book:
+            del self._by_key[(book.title, book.author)]
+        for index in self.indexes.values():
+            index.remove(book)
+        # A columnar catalog only drops the slot here; the row itself is compacted away later
+        del self._books[position]
+
+    def add_index(self, name, index):
+        """Register a CatalogIndex; it is built now and maintained on every change."""
+        index.rebuild(self._books)
+        self.indexes[name] = index
+        return index
+
+    def enable_search_indexes(self):
+        """Index title, author and genre for substring search."""
+        for field in ("title", "author", "genre"):
+            self.add_index(field, NGramIndex(field))
+
+    def enable_range_indexes(self):
+        """Keep year and copies_available sorted for exact and range queries."""
+        for field in ("year", "copies_available"):
+            self.add_index(field, SortedIndex(field))
+
+    def enable_popularity_index(self):
+        """Maintain the popularity leaderboard used by the "popular" display."""
+        self.add_index("popularity", PopularityIndex())
+
+    def enable_sql_search(self):
+        """Answer text and range searches with SQL on a row-capable backend (use with journal_mode)."""
+        # Start from a table that matches the loaded catalog, including the computed counters
+        with self._save_lock, self.file_handler.lock():
+            self._write_snapshot(include_views=False)
+            self._note_own_writes()
+        for field in ("title", "author", "genre", "year", "copies_available"):
+            self.add_index(field, SqlSearchIndex(self.file_handler, field))
+
+    def _stripe(self, book):
+        return hash((book.title, book.author)) % len(self._book_locks)
+
+    def book_lock(self, book):
+        """The lock guarding circulation changes to `book`; books share a fixed set of striped locks."""
+        return self._book_locks[self._stripe(book)]
 
-    def load_books(self):
+    def book_locks(self, books=None):
+        """Hold the locks of the given books (of every book by default), always taken in the same order."""
+        stripes = range(len(self._book_locks)) if books is None else sorted({self._stripe(book) for book in books})
+        stack = ExitStack()
+        for stripe in stripes:
+            stack.enter_context(self._book_locks[stripe])
+        return stack
+
+    @contextmanager
+    def changing(self, book):
+        """
+        Hold the book's lock while changing it. The change is recorded
+        against the state the book had on entry, so a merge with another
+        process's save applies it as a difference (one copy fewer) instead
+        of overwriting their row.
+        """
+        with self.book_lock(book):
+            before = book.to_dict()
+            yield book
+            if book.to_dict() != before:
+                self.book_updated(book, before)
+
+    def get_book(self, book_id):
+        """Return the book with the given id, or None."""
+        return self._by_id.get(book_id)
+
+    def find_book(self, title, author=None):
+        """Return the first book with the title (and author, if given), or None."""
+        if author is not None:
+            return self._by_key.get((title, author))
+        same_title = self._by_title.get(title)
+        return same_title[0] if same_title else None
+
+    def load_books(self, chunksize=None):
+        """Load books.csv; with `chunksize` the file is parsed in bounded chunks."""
         try:
-            books_data = self.file_handler.load_csv("books.csv")
-            if books_data.empty:
-                print("books.csv exists but contains no data. Books list remains empty.")
-                return []
-
-            return [
-                Book(
-                    title=row["title"],
-                    author=row["author"],
-                    is_loaned=str(row["is_loaned"]).strip().lower() in ["yes", "true"],
-                    copies=int(row["copies"]),
-                    genre=row["genre"],
-                    year=int(row["year"])
-                ) for _, row in books_data.iterrows()
-            ]
+            if chunksize:
+                frames = self.file_handler.iter_csv("books.csv", chunksize, dtype=self.BOOK_DTYPES)
+            else:
+                books_data = self.file_handler.load_csv("books.csv", dtype=self.BOOK_DTYPES)
+                if books_data.empty:
+                    print("books.csv exists but contains no data. Books list remains empty.")
+                    return []
+                frames = [books_data]
+
+            if self.columnar:
+                catalog = ColumnarCatalog()
+                for frame in frames:
+                    catalog.extend_columns(*self._frame_columns(frame))
+                return catalog
+            return [book for frame in frames for book in self._books_from_frame(frame)]
         except FileNotFoundError:
             print("books.csv not found. Initializing a new file on save.")
             return []
@@ -33,36 +260,371 @@ class BookManager:
             print(f"Unexpected error loading books: {e}")
             return []
 
+    def iter_books(self, chunksize=50000):
+        """Stream books from books.csv without holding the whole file in memory."""
+        for chunk in self.file_handler.iter_csv("books.csv", chunksize, dtype=self.BOOK_DTYPES):
+            yield from self._books_from_frame(chunk)
+
+    def _frame_columns(self, books_data):
+        """
+        Normalize a books DataFrame into (title, author, is_loaned, copies, genre,
+        year, loaned_count, copies_available, popularity_count, waiting_list)
+        lists. Counters missing from older files are derived from is_loaned and
+        copies; books without a waiting list get None.
+        """
+        is_loaned = books_data["is_loaned"].astype(str).str.strip().str.lower().isin(["yes", "true"])
+        copies = books_data["copies"].astype(int)
+        loaned_count = self._count_column(books_data, "loaned_count", copies.where(is_loaned, 0))
+        copies_available = self._count_column(books_data, "copies_available", copies.where(~is_loaned, 0))
+        popularity_count = self._count_column(books_data, "popularity_count", loaned_count)
+        if "waiting_list" in books_data:
+            waiting_list = [value if isinstance(value, str) and value else None
+                            for value in books_data["waiting_list"].tolist()]
+        else:
+            waiting_list = [None] * len(books_data)
+        return (
+            books_data["title"].tolist(),
+            books_data["author"].tolist(),
+            is_loaned.tolist(),
+            copies.tolist(),
+            books_data["genre"].tolist(),
+            books_data["year"].astype(int).tolist(),
+            loaned_count.tolist(),
+            copies_available.tolist(),
+            popularity_count.tolist(),
+            waiting_list,
+        )
+
+    @staticmethod
+    def _count_column(books_data, name, default):
+        """An integer column, falling back to `default` where it is missing or empty."""
+        if name not in books_data:
+            return default
+        return pd.to_numeric(books_data[name], errors="coerce").fillna(default).astype(int)
+
+    def _books_from_frame(self, books_data):
+        """Build Book objects column-wise instead of row by row."""
+        columns = self._frame_columns(books_data)
+        books = [Book(*row) for row in zip(*columns[:6])]
+        for book, loaned_count, copies_available, popularity_count, waiting_list in zip(books, *columns[6:]):
+            book.loaned_count = loaned_count
+            book.copies_available = copies_available
+            book.popularity_count = popularity_count
+            book.waiting_list = waiting_list
+        return books
+
+    def memory_report(self):
+        """Compare the memory footprint of the catalog as objects and as columns."""
+        return ColumnarCatalog.memory_report(self.books)
+
+    def replay_journal(self):
+        """Apply the records of books.journal on top of the loaded CSV snapshot."""
+        records = self.file_handler.load_records(self.JOURNAL_FILE)
+        for record in records:
+            self._apply_record(record)
+        self._journal_length = len(records)
+        if records:
+            print(f"Replayed {len(records)} journal records from {self.JOURNAL_FILE}.")
+
+    def _apply_record(self, record):
+        existing = self.find_book(record.get("title"), record.get("author"))
+        if record.get("op") != "upsert":
+            if existing is not None:
+                self._delete_book(existing)
+        elif existing is None:
+            self._insert_book(Book.from_dict(record["book"]))
+        else:
+            # Updated in place: the book keeps its id, its position and any references to it
+            self._copy_state(existing, Book.from_dict(record["book"]))
+
+    def _copy_state(self, book, source):
+        """Give `book` the circulation state and details of `source`."""
+        for name in self.BOOK_STATE:
+            setattr(book, name, getattr(source, name))
+        if book.waiting_list != source.waiting_list:
+            book.waiting_list = source.waiting_list
+        self.version += 1
+        for index in self.indexes.values():
+            index.update(book)
+
+    def _change_sequences(self):
+        """Change sequences of WATCHED_FILES, or None when the file handler does not track them."""
+        sequences = {file_name: self.file_handler.change_sequence(file_name) for file_name in self.WATCHED_FILES}
+        return sequences if all(isinstance(value, int) for value in sequences.values()) else None
+
+    def _changed_elsewhere(self):
+        """True if another process wrote the catalog since this one last read or wrote it."""
+        source, seen = self._seen_sequences
+        current = self._change_sequences()
+        if source is not self.file_handler:
+            # A different file handler was plugged in; its files are taken as they are
+            self._seen_sequences = (self.file_handler, current)
+            return False
+        return current is not None and seen is not None and current != seen
+
+    def _note_own_writes(self):
+        """Move the seen sequences past our own writes, unless another process wrote in between."""
+        source, seen = self._seen_sequences
+        if source is not self.file_handler or seen is None:
+            return
+        for file_name in self.WATCHED_FILES:
+            first, last = self.file_handler.write_sequences.get(file_name, (None, None))
+            if first is not None and first <= seen[file_name] <= last:
+                seen[file_name] = last
+
+    def _reload(self):
+        """
+        Reload from disk, then re-apply the changes not written yet: a book
+        changed here wins. Books are updated in place, so references held
+        elsewhere (holds, running borrows, search results) stay valid. Call
+        while holding every book lock.
+        """
+        sequences = self._change_sequences()
+        records = self._take_pending()
+        loaded = self.load_books()
+        with self._lock:
+            self._sync_books(loaded)
+            if self.journal_mode:
+                self.replay_journal()
+            records = {key: self._rebase(record) for key, record in records.items()}
+            for record in records.values():
+                self._apply_record(record)
+            self._restore_pending(records)
+        self._seen_sequences = (self.file_handler, sequences)
+
+    def _sync_books(self, loaded):
+        """Make the catalog match freshly loaded books, keeping the objects and ids of the books still there."""
+        keys = set()
+        for fresh in loaded:
+            keys.add((fresh.title, fresh.author))
+            existing = self.find_book(fresh.title, fresh.author)
+            if existing is None:
+                self._insert_book(fresh)
+            else:
+                self._copy_state(existing, fresh)
+        for book in [book for book in self._books if (book.title, book.author) not in keys]:
+            self._delete_book(book)
+
+    def _rebase(self, record):
+        """Move a change recorded with its starting state on top of the reloaded book."""
+        existing = self.find_book(record["title"], record["author"])
+        if "before" not in record or existing is None:
+            return record
+        theirs = existing.to_dict()
+        return dict(record, book=self._merge_row(record["before"], record["book"], theirs), before=theirs)
+
+    @classmethod
+    def _merge_row(cls, before, ours, theirs):
+        """
+        Three-way merge of a book row: counters add up both sides' changes,
+        waiting lists keep both sides' additions and removals, and any other
+        field changed here wins.
+        """
+        merged = {name: ours[name] if ours[name] != before[name] else theirs[name] for name in theirs}
+        for name in cls.COUNTERS:
+            merged[name] = theirs[name] + ours[name] - before[name]
+        if ours["copies_available"] != before["copies_available"]:
+            merged["is_loaned"] = merged["copies_available"] <= 0
+        before_list, our_list, their_list = ((row["waiting_list"] or "").split(",") for row in (before, ours, theirs))
+        removed = set(before_list) - set(our_list)
+        added = [entry for entry in our_list if entry and entry not in before_list and entry not in their_list]
+        merged["waiting_list"] = ",".join([entry for entry in their_list if entry and entry not in removed] + added)
+        return merged
+
+    def refresh_if_changed(self):
+        """
+        Reload the catalog if another process changed it since this one last
+        read or wrote it; returns True if it did. Costs a stat() of the change
+        sequence file when nothing changed.
+        """
+        if not self._changed_elsewhere():
+            return False
+        with self._save_lock, self.book_locks(), self.file_handler.lock():
+            if not self._changed_elsewhere():
+                return False
+            self._reload()
+        print("The catalog was changed by another process and has been reloaded.")
+        return True
+
     def book_exists(self, title):
-      return any(book.title == title for book in self.books)
+      return title in self._by_title
+
+    def book_updated(self, book, before=None):
+        """
+        Record that a book changed so the indexes follow it and the next save
+        persists it. With `before`, the book's row before the change (see
+        changing()), the change is merged into another process's save of the
+        same book instead of replacing it.
+        """
+        with self._lock:
+            self.version += 1
+            for index in self.indexes.values():
+                index.update(book)
+            if self._keeps_pending():
+                key = (book.title, book.author)
+                record = {"op": "upsert", "title": book.title, "author": book.author, "book": book.to_dict()}
+                previous = self._pending_records.get(key)
+                if previous is not None:
+                    # Unsaved changes accumulate against the state before the first of them
+                    before = previous.get("before")
+                if before is not None:
+                    record["before"] = before
+                self._pending_records[key] = record
+
+    def _keeps_pending(self):
+        """
+        Unsaved changes are journaled in journal mode; otherwise they are only
+        needed to re-apply after merging another process's save, which
+        requires a file handler that tracks change sequences.
+        """
+        source, seen = self._seen_sequences
+        return self.journal_mode or (source is self.file_handler and seen is not None)
 
     def save_books(self):
-        try:
-            if not self.books:
-                print("No books available to save. Skipping save operation.")
+        if self.group_commit_interval is None and self.group_commit_changes is None:
+            self._persist()
+            return
+        with self._lock:
+            self._dirty_changes += 1
+            flush_now = self.group_commit_changes is not None and self._dirty_changes >= self.group_commit_changes
+            if not flush_now and self._flush_timer is None and self.group_commit_interval is not None:
+                self._flush_timer = threading.Timer(self.group_commit_interval, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        if flush_now:
+            self.flush()
+
+    def flush(self):
+        """Persist any changes still waiting for a group commit."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            changes, self._dirty_changes = self._dirty_changes, 0
+        if changes:
+            self._persist()
+
+    def _persist(self):
+        with self._save_lock:
+            with self.file_handler.lock():
+                if not self._changed_elsewhere():
+                    self._write_pending()
+                    return
+            # Another process saved since we loaded: merge its data under the book locks, so no
+            # borrow or return is half-way through a book while it is reloaded
+            with self.book_locks(), self.file_handler.lock():
+                if self._changed_elsewhere():
+                    print("The catalog was changed by another process. Merging before saving.")
+                    self._reload()
+                self._write_pending()
+
+    def _write_pending(self):
+        """Write the pending changes: appended to the journal or as a full snapshot."""
+        if self.journal_mode:
+            self._write_journal()
+        else:
+            records = self._take_pending()
+            if not self._write_snapshot(self.derived_views == "always"):
+                self._restore_pending(records)
+        self._note_own_writes()
+
+    def _take_pending(self):
+        with self._lock:
+            records, self._pending_records = self._pending_records, {}
+        return records
+
+    def _restore_pending(self, records):
+        """Put back records that could not be written, unless their book changed again since."""
+        with self._lock:
+            for key, record in records.items():
+                self._pending_records.setdefault(key, record)
+
+    def checkpoint(self):
+        """Write the full CSV snapshot and start a new, empty journal."""
+        with self._save_lock, self.file_handler.lock():
+            with self._lock:
+                # The snapshot reads these books after the lock is released, so it covers the dropped records
+                books = list(self.books)
+                records = self._take_pending()
+            if not self._write_snapshot(self.derived_views in ("always", "checkpoint"), books):
+                self._restore_pending(records)
                 return
-            all_books_df = pd.DataFrame([book.to_dict() for book in self.books])
-            loaned_books_df = all_books_df[all_books_df["copies_available"] == 0]
-            available_books_df = all_books_df[all_books_df["copies_available"] > 0]
-            self.file_handler.save_csv("books.csv", all_books_df)
-            self.file_handler.save_csv("loaned_books.csv", loaned_books_df)
-            self.file_handler.save_csv("available_books.csv", available_books_df)
+            self.file_handler.truncate_file(self.JOURNAL_FILE)
+            self._journal_length = 0
+            self._note_own_writes()
 
+    def _write_journal(self):
+        records = self._take_pending()
+        if not records:
+            return
+        if self.file_handler.supports_row_updates():
+            self._write_rows(records)
+            return
+        journaled = [{name: value for name, value in record.items() if name != "before"} for record in records.values()]
+        if self.file_handler.append_records(self.JOURNAL_FILE, journaled):
+            self._journal_length += len(records)
+        else:
+            self._restore_pending(records)
+        if self._journal_length >= self.checkpoint_interval:
+            self.checkpoint()
+
+    def _write_rows(self, records):
+        """Apply the pending changes as row-level upserts and deletes."""
+        upserts = [record["book"] for record in records.values() if record["op"] == "upsert"]
+        deletes = [{"title": title, "author": author}
+                   for (title, author), record in records.items() if record["op"] == "remove"]
+        if not self.file_handler.write_rows("books.csv", upserts, deletes):
+            self._restore_pending(records)
+
+    def _write_snapshot(self, include_views=True, books=None):
+        try:
+            if books is None:
+                with self._lock:
+                    books = list(self.books)
+            if not books:
+                print("No books available to save. Skipping save operation.")
+                return False
+            all_books_df = pd.DataFrame([book.to_dict() for book in books])
+            if not self.file_handler.save_csv("books.csv", all_books_df):
+                # The caller keeps the unsaved changes; a checkpoint keeps the journal
+                return False
+            if include_views:
+                for name in self.VIEW_FILES:
+                    self.export_view(name)
+            return True
         except Exception as e:
             print(f"Error saving books: {e}")
+            return False
+
+    def export_view(self, name):
+        """Write loaned_books.csv or available_books.csv from its maintained membership."""
+        if name not in self.VIEW_FILES:
+            raise ValueError(f"Invalid view: {name}. Use 'loaned' or 'available'.")
+        view = self.indexes.get(name)
+        if view is None:
+            print(f"Derived views are off; {self.VIEW_FILES[name]} was not written.")
+            return False
+        with self._lock:
+            books = list(view.books())
+        view_df = pd.DataFrame([book.to_dict() for book in books], columns=self.BOOK_COLUMNS)
+        self.file_handler.save_csv(self.VIEW_FILES[name], view_df)
+        return True
 
     @Logger().log_action
     def add_book(self, title, author, genre, year, copies):
         """Add a new book or update an existing book."""
         try:
-            book = next((b for b in self.books if b.title == title and b.author == author), None)
-            if book:
-                book.copies += copies
-                book.copies_available += copies
-                book.is_loaned = book.copies_available == 0
-            else:
-                new_book = Book(title, author, False, copies, genre, year)
-                self.books.append(new_book)
+            with self._lock:
+                book = self.find_book(title, author)
+                inserted = book is None
+                if inserted:
+                    book = self._insert_book(Book(title, author, False, copies, genre, year))
+                    self.book_updated(book)
+            if not inserted:
+                with self.changing(book):
+                    book.copies += copies
+                    book.copies_available += copies
+                    book.is_loaned = book.copies_available == 0
 
             self.save_books()
             return True
@@ -74,13 +636,18 @@ class BookManager:
     def remove_book(self, title):
         """Remove a book by title."""
         try:
-            existing_book_count = len(self.books)
-            self.books = [book for book in self.books if book.title != title]
+            with self._lock:
+                removed_books = list(self._by_title.get(title, ()))
+                if not removed_books:
+                    # No book was removed
+                    print(f"No book with title '{title}' found.")
+                    return False
 
-            if len(self.books) == existing_book_count:
-                # No book was removed
-                print(f"No book with title '{title}' found.")
-                return False
+                for book in removed_books:
+                    self._delete_book(book)
+                    if self._keeps_pending():
+                        self._pending_records[(book.title, book.author)] = {
+                            "op": "remove", "title": book.title, "author": book.author}
 
             self.save_books()
             return True
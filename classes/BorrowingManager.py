@@ -1,65 +1,160 @@
+from collections import namedtuple
+
 from classes.BookManager import BookManager
 from classes.Logger import Logger
 
+# Outcome of one (title, username) item of borrow_many/return_many
+ItemResult = namedtuple("ItemResult", ["title", "username", "ok", "message"])
+
+
+class BulkResult:
+    """
+    Result of borrow_many/return_many: true only if every item was applied.
+    `items` holds an ItemResult per input item; when any item fails, none
+    are applied and `failures` lists the ones that prevented it. If the
+    items were applied but the catalog could not be saved, the result is
+    still true and each message says so; the next save writes them.
+    """
+
+    def __init__(self, items, applied):
+        self.items = items
+        self.applied = applied
+
+    def __bool__(self):
+        return self.applied
+
+    @property
+    def failures(self):
+        return [item for item in self.items if not item.ok]
 
 
 class BorrowingManager:
 
-    def __init__(self):
-        self.book_manager = BookManager()
+    def __init__(self, book_manager=None, hold_manager=None, ledger=None):
+        """
+        Works on the shared catalog of the default data directory unless a
+        BookManager is given. With a HoldManager, a returned copy is held for
+        the next user on the waiting list instead of being free for anyone.
+        With a LoanLedger, every loan and return is recorded per user.
+        """
+        self.book_manager = book_manager if book_manager is not None else BookManager.shared()
+        self.hold_manager = hold_manager
+        self.ledger = ledger
+        if hold_manager is not None:
+            if hold_manager.on_change is None:
+                hold_manager.on_change = self._hold_changed
+            if hold_manager.lock_for is None:
+                # Records the waiting-list change an expired hold makes
+                hold_manager.lock_for = self.book_manager.changing
+            if hold_manager.file_handler is not None and not len(hold_manager):
+                # Copies reserved before a restart stay reserved for their holders
+                hold_manager.restore(self.book_manager.find_book)
+
+    def _hold_changed(self, book):
+        self.book_manager.save_books()
+
+    def _loans_held(self, book, username):
+        """How many copies of `book` the ledger has on loan to `username`."""
+        return len([loan for loan in self.ledger.loans_of(username)
+                    if (loan.title, loan.author) == (book.title, book.author)])
+
+    def _untracked_loans(self, book):
+        """Copies of `book` on loan without a ledger entry, e.g. lent before the ledger was kept."""
+        return book.copies - book.copies_available - len(self.ledger.loans_of_book(book))
+
+    @staticmethod
+    def _save_failed(results):
+        """Note on the applied items of a bulk call that the catalog could not be saved."""
+        return [item._replace(message=f"{item.message}, not saved yet") for item in results]
+
+    @staticmethod
+    def _ledger_failed(results):
+        """Fail the accepted items of a bulk call whose ledger entries could not be written."""
+        return [item._replace(ok=False, message="not recorded in the loan ledger") if item.ok else item
+                for item in results]
+
+    def _expire_holds(self):
+        """Pass on copies whose hold ran out, even when the timer thread was not started; call without book locks."""
+        if self.hold_manager is not None:
+            self.hold_manager.expire_due()
+
+    def _free_copies(self, book, username):
+        """Copies this user may borrow: held copies only count for their holder."""
+        if self.hold_manager is None:
+            return book.copies_available
+        if username and self.hold_manager.claim(book, username):
+            return book.copies_available
+        return book.copies_available - self.hold_manager.held_copies(book)
 
     @Logger().log_action
     def borrow_book(self, title, username=None):
         """Borrow a book or add the user to the waiting list if unavailable."""
         try:
-            book = next((b for b in self.book_manager.books if b.title == title), None)
+            # Check against the latest save of other processes, not the copies loaded at startup
+            self.book_manager.refresh_if_changed()
+            self._expire_holds()
+            book = self.book_manager.find_book(title)
             if not book:
                 print(f"Error: Book '{title}' not found.")
                 return False
 
-            # Check if the book is available
-            if book.copies_available > 0:
-                book.copies_available -= 1
-                book.loaned_count += 1
-                book.popularity_count += 1
-
-                # Update `is_loaned` status
-                if book.copies_available == 0:
-                    book.is_loaned = True
+            # Check and update under the book's lock, so two desks cannot both take the last copy
+            with self.book_manager.changing(book):
+                borrowed = self._free_copies(book, username) > 0
+                if borrowed and self.ledger is not None and self.ledger.record_loan(book, username) is None:
+                    # Lend nothing the ledger has no record of
+                    print(f"Error: the loan of '{title}' to {username} could not be recorded in the loan ledger.")
+                    return False
+                if borrowed:
+                    book.copies_available -= 1
+                    book.loaned_count += 1
+                    book.popularity_count += 1
 
-                self.book_manager.save_books()
-                print(f"Book '{title}' borrowed by {username or 'anonymous'}.")
-                return True
-            else:
-                # Book is unavailable; add the user to the waiting list
-                if username:
+                    # Update `is_loaned` status
+                    if book.copies_available == 0:
+                        book.is_loaned = True
+                elif username:
+                    # Book is unavailable; add the user to the waiting list
                     book.waiting_list_manager.add_to_waiting_list(username)
-                    print(f"{username} added to the waiting list for '{title}'.")
-                    self.book_manager.save_books()
-                    return True
                 else:
                     print(f"Book '{title}' is unavailable, and no user name provided for the waiting list.")
                     return False
+
+            # Saving happens outside the lock
+            self.book_manager.save_books()
+            if borrowed:
+                print(f"Book '{title}' borrowed by {username or 'anonymous'}.")
+            else:
+                print(f"{username} added to the waiting list for '{title}'.")
+            return True
         except Exception as e:
             print(f"Error borrowing book: {e}")
             return False
 
     @Logger().log_action
-    def return_book(self, title):
+    def return_book(self, title, username=None):
         """Return a book and notify the next user in the waiting list."""
         try:
-            book = next((b for b in self.book_manager.books if b.title == title), None)
+            book = self.book_manager.find_book(title)
             if not book:
                 print(f"Error: Book '{title}' not found.")
                 return False
 
-            # Increment available copies
-            book.copies_available += 1
-            if book.copies_available > 0:
-                book.is_loaned = False  # Mark the book as not loaned
+            with self.book_manager.changing(book):
+                # The loan is closed under the book's lock, so two desks cannot both return it
+                if self.ledger is not None and not self._close_loan(book, username):
+                    return False
+
+                # Increment available copies
+                book.copies_available += 1
+                if book.copies_available > 0:
+                    book.is_loaned = False  # Mark the book as not loaned
+
+                # Notify the next user in the waiting list
+                next_user = book.waiting_list_manager.remove_from_waiting_list()
+                if next_user and self.hold_manager is not None:
+                    self.hold_manager.place(book, next_user)
 
-            # Notify the next user in the waiting list
-            next_user = book.waiting_list_manager.remove_from_waiting_list()
             if next_user:
                 print(f"Notification: The book '{title}' is now available for {next_user}.")
             else:
@@ -69,3 +164,163 @@ class BorrowingManager:
         except Exception as e:
             print(f"Error returning book: {e}")
             return False
+
+    def _close_loan(self, book, username):
+        """Close the user's ledger loan of `book`; call under the book's lock. False if it may not be returned."""
+        if self._loans_held(book, username):
+            if self.ledger.record_return(book, username) is None:
+                print(f"Error: the return of '{book.title}' by {username} could not be recorded in the loan ledger.")
+                return False
+            return True
+        if self._untracked_loans(book) > 0:
+            # Lent before the ledger was kept: there is no borrower on record to check
+            return True
+        print(f"Error: Book '{book.title}' is not on loan to {username}.")
+        return False
+
+    def _resolve(self, items):
+        """Turn (title, username) items into [(title, username, book or None)], looking each title up once."""
+        books = {}
+        resolved = []
+        for title, username in items:
+            if title not in books:
+                books[title] = self.book_manager.find_book(title)
+            resolved.append((title, username, books[title]))
+        return resolved
+
+    @Logger().log_action
+    def borrow_many(self, items):
+        """
+        Borrow many (title, username) items at once, e.g. a class set. Either
+        every item gets a copy or nothing changes; the catalog is saved once.
+        Returns a BulkResult.
+        """
+        results = []
+        try:
+            self.book_manager.refresh_if_changed()
+            self._expire_holds()
+            resolved = self._resolve(items)
+            books = {id(book): book for _, _, book in resolved if book is not None}
+            with self.book_manager.book_locks(books.values()):
+                before = {key: book.to_dict() for key, book in books.items()}
+                plan, walk_in_copies, holders = [], {}, set()
+                for title, username, book in resolved:
+                    if book is None:
+                        results.append(ItemResult(title, username, False, "not found"))
+                        continue
+                    if id(book) not in walk_in_copies:
+                        held = self.hold_manager.held_copies(book) if self.hold_manager is not None else 0
+                        walk_in_copies[id(book)] = book.copies_available - held
+                    holds_copy = (self.hold_manager is not None and username and (id(book), username) not in holders
+                                  and self.hold_manager.has_hold(book, username))
+                    if holds_copy:
+                        holders.add((id(book), username))
+                    elif walk_in_copies[id(book)] > 0:
+                        walk_in_copies[id(book)] -= 1
+                    else:
+                        results.append(ItemResult(title, username, False, "unavailable"))
+                        continue
+                    results.append(ItemResult(title, username, True, "borrowed"))
+                    plan.append((book, username, holds_copy))
+
+                if len(plan) < len(results):
+                    print(f"Bulk borrow rejected: {len(results) - len(plan)} of {len(results)} items failed.")
+                    return BulkResult(results, False)
+                loans = [(book, username) for book, username, _ in plan]
+                if self.ledger is not None and loans and not self.ledger.record_loans(loans):
+                    print("Bulk borrow rejected: the loans could not be recorded in the loan ledger.")
+                    return BulkResult(self._ledger_failed(results), False)
+
+                for book, username, holds_copy in plan:
+                    if holds_copy:
+                        self.hold_manager.claim(book, username)
+                    book.copies_available -= 1
+                    book.loaned_count += 1
+                    book.popularity_count += 1
+                    if book.copies_available == 0:
+                        book.is_loaned = True
+                for key, book in books.items():
+                    self.book_manager.book_updated(book, before[key])
+
+            try:
+                self.book_manager.save_books()
+            except Exception as e:
+                # Applied in memory, so nothing is undone; the next save writes them
+                print(f"Error saving the bulk borrow: {e}")
+                results = self._save_failed(results)
+            print(f"Bulk borrow: {len(plan)} books borrowed.")
+            return BulkResult(results, True)
+        except Exception as e:
+            print(f"Error borrowing books: {e}")
+            return BulkResult(results, False)
+
+    @Logger().log_action
+    def return_many(self, items):
+        """
+        Return many (title, username) items at once, e.g. at the end of term.
+        Either every item is returned or nothing changes; a title cannot be
+        returned more often than it has copies on loan and, with a LoanLedger,
+        only by a user it is on loan to (or, for copies lent before the ledger
+        was kept, by anyone). The catalog is saved once. Returns a BulkResult.
+        """
+        results = []
+        try:
+            self.book_manager.refresh_if_changed()
+            resolved = self._resolve(items)
+            books = {id(book): book for _, _, book in resolved if book is not None}
+            with self.book_manager.book_locks(books.values()):
+                before = {key: book.to_dict() for key, book in books.items()}
+                plan, on_loan, user_loans, untracked, closing = [], {}, {}, {}, []
+                for title, username, book in resolved:
+                    if book is None:
+                        results.append(ItemResult(title, username, False, "not found"))
+                        continue
+                    if id(book) not in on_loan:
+                        on_loan[id(book)] = book.copies - book.copies_available
+                    if on_loan[id(book)] <= 0:
+                        results.append(ItemResult(title, username, False, "no copies on loan"))
+                        continue
+                    if self.ledger is not None:
+                        key = (id(book), username)
+                        if key not in user_loans:
+                            user_loans[key] = self._loans_held(book, username)
+                        if id(book) not in untracked:
+                            untracked[id(book)] = self._untracked_loans(book)
+                        if user_loans[key] > 0:
+                            user_loans[key] -= 1
+                            closing.append((book, username))
+                        elif untracked[id(book)] > 0:
+                            untracked[id(book)] -= 1
+                        else:
+                            results.append(ItemResult(title, username, False, "not on loan to user"))
+                            continue
+                    on_loan[id(book)] -= 1
+                    results.append(ItemResult(title, username, True, "returned"))
+                    plan.append((book, username))
+
+                if len(plan) < len(results):
+                    print(f"Bulk return rejected: {len(results) - len(plan)} of {len(results)} items failed.")
+                    return BulkResult(results, False)
+                if closing and len(self.ledger.record_returns(closing)) < len(closing):
+                    print("Bulk return rejected: the returns could not be recorded in the loan ledger.")
+                    return BulkResult(self._ledger_failed(results), False)
+
+                for book, _ in plan:
+                    book.copies_available += 1
+                    book.is_loaned = False
+                    next_user = book.waiting_list_manager.remove_from_waiting_list()
+                    if next_user and self.hold_manager is not None:
+                        self.hold_manager.place(book, next_user)
+                for key, book in books.items():
+                    self.book_manager.book_updated(book, before[key])
+
+            try:
+                self.book_manager.save_books()
+            except Exception as e:
+                print(f"Error saving the bulk return: {e}")
+                results = self._save_failed(results)
+            print(f"Bulk return: {len(plan)} books returned.")
+            return BulkResult(results, True)
+        except Exception as e:
+            print(f"Error returning books: {e}")
+            return BulkResult(results, False)
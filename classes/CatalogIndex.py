@@ -0,0 +1,218 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+
+
+class CatalogIndex(ABC):
+    """Secondary index over the catalog, kept up to date by BookManager."""
+
+    def rebuild(self, books):
+        """Discard the current contents and index every book."""
+        self.clear()
+        for book in books:
+            self.add(book)
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+    @abstractmethod
+    def add(self, book):
+        pass
+
+    @abstractmethod
+    def remove(self, book):
+        pass
+
+    def update(self, book):
+        """Re-index a book whose fields changed (e.g. after a borrow or return)."""
+        pass
+
+
+class NGramIndex(CatalogIndex):
+    """
+    Inverted index from lowercase n-grams of one text field to book ids.
+    A substring query is answered by intersecting the posting sets of its
+    n-grams and checking only those candidates.
+    """
+
+    def __init__(self, field, n=3):
+        self.field = field
+        self.n = n
+        self.clear()
+
+    def clear(self):
+        self._postings = {}
+        self._values = {}
+        self._books = {}
+
+    def _grams(self, value):
+        return {value[i:i + self.n] for i in range(len(value) - self.n + 1)}
+
+    def add(self, book):
+        value = str(getattr(book, self.field)).lower()
+        self._values[book.book_id] = value
+        self._books[book.book_id] = book
+        for gram in self._grams(value):
+            self._postings.setdefault(gram, set()).add(book.book_id)
+
+    def remove(self, book):
+        value = self._values.pop(book.book_id, None)
+        self._books.pop(book.book_id, None)
+        if value is None:
+            return
+        for gram in self._grams(value):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(book.book_id)
+                if not posting:
+                    del self._postings[gram]
+
+    def update(self, book):
+        if self._values.get(book.book_id) != str(getattr(book, self.field)).lower():
+            self.remove(book)
+            self.add(book)
+
+    def search(self, query):
+        """Return the books whose field contains `query` (case-insensitive), in insertion order."""
+        query = str(query).lower()
+        grams = self._grams(query)
+        if grams:
+            postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+        else:
+            # Queries shorter than n have no n-grams to look up
+            candidates = self._values.keys()
+        matches = sorted(book_id for book_id in candidates if query in self._values[book_id])
+        return [self._books[book_id] for book_id in matches]
+
+
+class SortedIndex(CatalogIndex):
+    """
+    Keeps (value, book_id) pairs of one numeric field in sorted order, so
+    range queries cost O(log n + k) via bisect.
+    """
+
+    def __init__(self, field):
+        self.field = field
+        self.clear()
+
+    def clear(self):
+        self._keys = []
+        self._values = {}
+        self._books = {}
+
+    def _value(self, book):
+        return getattr(book, self.field)
+
+    def rebuild(self, books):
+        self.clear()
+        for book in books:
+            self._values[book.book_id] = self._value(book)
+            self._books[book.book_id] = book
+        self._keys = sorted((value, book_id) for book_id, value in self._values.items())
+
+    def add(self, book):
+        value = self._value(book)
+        self._values[book.book_id] = value
+        self._books[book.book_id] = book
+        insort(self._keys, (value, book.book_id))
+
+    def remove(self, book):
+        value = self._values.pop(book.book_id, None)
+        self._books.pop(book.book_id, None)
+        if value is None:
+            return
+        position = bisect_left(self._keys, (value, book.book_id))
+        if position < len(self._keys) and self._keys[position] == (value, book.book_id):
+            del self._keys[position]
+
+    def update(self, book):
+        if self._values.get(book.book_id) != self._value(book):
+            self.remove(book)
+            self.add(book)
+
+    def range(self, low=None, high=None):
+        """Return the books whose value lies in [low, high]; None leaves a side open."""
+        start = 0 if low is None else bisect_left(self._keys, (low,))
+        end = len(self._keys) if high is None else bisect_right(self._keys, (high, float("inf")))
+        return [self._books[book_id] for _, book_id in self._keys[start:end]]
+
+
+class PopularityIndex(SortedIndex):
+    """
+    Leaderboard ordered by popularity_count (highest first), ties broken by
+    book id. Each borrow moves one entry, and top(k) reads the first k.
+    """
+
+    def __init__(self):
+        super().__init__("popularity_count")
+
+    def _value(self, book):
+        return -book.popularity_count
+
+    def top(self, k=10):
+        return [self._books[book_id] for _, book_id in self._keys[:k]]
+
+
+class MembershipIndex(CatalogIndex):
+    """The set of books matching a predicate, e.g. loaned or available books."""
+
+    def __init__(self, predicate):
+        self.predicate = predicate
+        self.clear()
+
+    def clear(self):
+        self._members = {}
+
+    def add(self, book):
+        if self.predicate(book):
+            self._members[book.book_id] = book
+
+    def remove(self, book):
+        self._members.pop(book.book_id, None)
+
+    def update(self, book):
+        if self.predicate(book):
+            self._members[book.book_id] = book
+        else:
+            self._members.pop(book.book_id, None)
+
+    def books(self):
+        """Return the member books in insertion order."""
+        return [self._members[book_id] for book_id in sorted(self._members)]
+
+    def __len__(self):
+        return len(self._members)
+
+
+class SqlSearchIndex(CatalogIndex):
+    """
+    Answers search() and range() for one books column with SQL on a
+    row-capable FileHandler backend, mapping the rows back to loaded books.
+    The database must be kept current, i.e. BookManager in journal mode.
+    """
+
+    def __init__(self, file_handler, field):
+        self.file_handler = file_handler
+        self.field = field
+        self.clear()
+
+    def clear(self):
+        self._books = {}
+
+    def add(self, book):
+        self._books[(book.title, book.author)] = book
+
+    def remove(self, book):
+        if self._books.get((book.title, book.author)) is book:
+            del self._books[(book.title, book.author)]
+
+    def _to_books(self, rows):
+        books = (self._books.get((row["title"], row["author"])) for row in rows)
+        return sorted((book for book in books if book is not None), key=lambda book: book.book_id)
+
+    def search(self, query):
+        return self._to_books(self.file_handler.search_rows("books.csv", self.field, query=query))
+
+    def range(self, low=None, high=None):
+        return self._to_books(self.file_handler.search_rows("books.csv", self.field, low=low, high=high))
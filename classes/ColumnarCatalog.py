@@ -0,0 +1,254 @@
+import sys
+from array import array
+
+from classes.Book import Book
+
+
+def _column(name):
+    """Property reading and writing one cell of a catalog column."""
+    def getter(self):
+        return self._catalog._columns[name][self._row]
+
+    def setter(self, value):
+        self._catalog._columns[name][self._row] = value
+
+    return property(getter, setter)
+
+
+def _string_column(name):
+    def getter(self):
+        return self._catalog._columns[name][self._row]
+
+    def setter(self, value):
+        self._catalog._columns[name][self._row] = sys.intern(str(value))
+
+    return property(getter, setter)
+
+
+class BookView:
+    """A lightweight, slot-only view of one row of a ColumnarCatalog that behaves like a Book."""
+    __slots__ = ("_catalog", "_row")
+
+    def __init__(self, catalog, row):
+        self._catalog = catalog
+        self._row = row
+
+    title = _string_column("title")
+    author = _string_column("author")
+    genre = _string_column("genre")
+    year = _column("year")
+    copies = _column("copies")
+    copies_available = _column("copies_available")
+    loaned_count = _column("loaned_count")
+    popularity_count = _column("popularity_count")
+
+    @property
+    def is_loaned(self):
+        return bool(self._catalog._columns["is_loaned"][self._row])
+
+    @is_loaned.setter
+    def is_loaned(self, value):
+        self._catalog._columns["is_loaned"][self._row] = 1 if value else 0
+
+    @property
+    def book_id(self):
+        book_id = self._catalog._columns["book_id"][self._row]
+        return None if book_id < 0 else book_id
+
+    @book_id.setter
+    def book_id(self, value):
+        self._catalog._columns["book_id"][self._row] = -1 if value is None else value
+
+    @property
+    def _waiting_list_manager(self):
+        return self._catalog._waiting_lists[self._row]
+
+    @_waiting_list_manager.setter
+    def _waiting_list_manager(self, value):
+        self._catalog._waiting_lists[self._row] = value
+
+    waiting_list_manager = Book.waiting_list_manager
+    waiting_list = Book.waiting_list
+    is_available = Book.is_available
+    update_details = Book.update_details
+    to_dict = Book.to_dict
+    __str__ = Book.__str__
+
+
+class ColumnarCatalog:
+    """
+    Struct-of-arrays book store: numeric fields live in typed arrays and
+    strings are interned, so a large catalog costs little more than its data.
+    It behaves like a list of BookView objects.
+
+    Rows never move while a view may read them: deleting a book only drops
+    its slot from the row indirection (`_rows`) and leaves a dead row behind,
+    so no view is renumbered and no column is shifted. The dead rows are
+    compacted away once they outnumber the live ones, which keeps deletes
+    amortized O(1) in interpreted work.
+    """
+    INT_COLUMNS = ("year", "copies", "copies_available", "loaned_count", "popularity_count")
+    STRING_COLUMNS = ("title", "author", "genre")
+    MIN_COMPACT_ROWS = 64
+
+    def __init__(self, books=()):
+        self._columns = {name: array("l") for name in self.INT_COLUMNS}
+        self._columns.update({name: [] for name in self.STRING_COLUMNS})
+        self._columns["is_loaned"] = array("b")
+        self._columns["book_id"] = array("q")
+        self._waiting_lists = []
+        self._views = []
+        self._rows = array("q")  # Position -> row of the live books, in catalog order
+        self._deleted = []  # Views deleted since the last compaction
+        for book in books:
+            self.append(book)
+
+    def extend_columns(self, title, author, is_loaned, copies, genre, year, loaned_count=None,
+                       copies_available=None, popularity_count=None, waiting_list=None):
+        """
+        Bulk-append books given as parallel column lists, as BookManager loads
+        them. Counters that are not given are derived from is_loaned and copies.
+        """
+        columns = self._columns
+        start = len(self._waiting_lists)
+        columns["title"].extend(sys.intern(str(value)) for value in title)
+        columns["author"].extend(sys.intern(str(value)) for value in author)
+        columns["genre"].extend(sys.intern(str(value)) for value in genre)
+        columns["year"].extend(year)
+        columns["copies"].extend(copies)
+        columns["is_loaned"].extend(1 if loaned else 0 for loaned in is_loaned)
+        columns["book_id"].extend([-1] * len(is_loaned))
+        if loaned_count is None:
+            loaned_count = [count if loaned else 0 for loaned, count in zip(is_loaned, copies)]
+        if copies_available is None:
+            copies_available = [0 if loaned else count for loaned, count in zip(is_loaned, copies)]
+        columns["loaned_count"].extend(loaned_count)
+        columns["popularity_count"].extend(loaned_count if popularity_count is None else popularity_count)
+        columns["copies_available"].extend(copies_available)
+        # Saved waiting lists stay strings until a view asks for its manager
+        self._waiting_lists.extend([None] * len(is_loaned) if waiting_list is None else waiting_list)
+        self._views.extend(BookView(self, row) for row in range(start, len(self._waiting_lists)))
+        self._rows.extend(range(start, len(self._waiting_lists)))
+
+    def append(self, book):
+        """Copy a Book (or any book-like object) into a new row."""
+        columns = self._columns
+        for name in self.STRING_COLUMNS:
+            columns[name].append(sys.intern(str(getattr(book, name))))
+        for name in self.INT_COLUMNS:
+            columns[name].append(getattr(book, name))
+        columns["is_loaned"].append(1 if book.is_loaned else 0)
+        book_id = getattr(book, "book_id", None)
+        columns["book_id"].append(-1 if book_id is None else book_id)
+        self._waiting_lists.append(getattr(book, "_waiting_list_manager", None))
+        row = len(self._waiting_lists) - 1
+        self._views.append(BookView(self, row))
+        self._rows.append(row)
+
+    def _copy_row(self, source, target):
+        for column in self._columns.values():
+            column[target] = column[source]
+        self._waiting_lists[target] = self._waiting_lists[source]
+
+    def __setitem__(self, index, book):
+        view = self._views[index]
+        if isinstance(book, BookView) and book._catalog is self:
+            # Moving a row (e.g. swap-delete): the moved view follows its data
+            row = self._rows[index]
+            self._copy_row(book._row, row)
+            book._row = row
+            self._views[index] = book
+            return
+        for name in self.STRING_COLUMNS + self.INT_COLUMNS + ("is_loaned", "book_id"):
+            setattr(view, name, getattr(book, name, None))
+        view._waiting_list_manager = getattr(book, "_waiting_list_manager", None)
+
+    def __delitem__(self, index):
+        # The row stays as it is, so the deleted view keeps reading its own data
+        self._deleted.append(self._views[index])
+        del self._views[index]
+        del self._rows[index]
+        dead = len(self._waiting_lists) - len(self._rows)
+        if dead > max(len(self._rows), self.MIN_COMPACT_ROWS):
+            self._compact()
+
+    def _compact(self):
+        """Drop the dead rows: live rows are copied in catalog order and their views renumbered."""
+        live = set(self._rows)
+        for view in self._deleted:
+            if view._catalog is self and view._row not in live:
+                # Still referenced elsewhere, e.g. by a search result: give it a one-row catalog of its own
+                detached = ColumnarCatalog([view])
+                detached._views = [view]
+                view._catalog, view._row = detached, 0
+        self._deleted = []
+        rows = self._rows
+        for name, column in self._columns.items():
+            values = [column[row] for row in rows]
+            self._columns[name] = array(column.typecode, values) if isinstance(column, array) else values
+        self._waiting_lists = [self._waiting_lists[row] for row in rows]
+        for position, view in enumerate(self._views):
+            view._row = position
+        self._rows = array("q", range(len(self._views)))
+
+    def pop(self, index=-1):
+        view = self._views[index]
+        del self[index]
+        return view
+
+    def __getitem__(self, index):
+        return self._views[index]
+
+    def __iter__(self):
+        return iter(self._views)
+
+    def __len__(self):
+        return len(self._views)
+
+    def memory_footprint(self):
+        """Approximate bytes held by the columns, interned strings and views."""
+        total = sys.getsizeof(self._views) + sys.getsizeof(self._waiting_lists) + sys.getsizeof(self._rows)
+        total += sum(sys.getsizeof(view) for view in self._views)
+        seen = set()
+        for name, column in self._columns.items():
+            total += sys.getsizeof(column)
+            if name in self.STRING_COLUMNS:
+                total += _unique_size(column, seen)
+        return total
+
+    @staticmethod
+    def memory_report(books):
+        """Compare the memory used by `books` as Book objects and as a columnar catalog."""
+        if isinstance(books, ColumnarCatalog):
+            catalog = books
+            objects = [Book.from_dict(view.to_dict()) for view in books]
+        else:
+            catalog = ColumnarCatalog(books)
+            objects = list(books)
+        object_bytes = _object_footprint(objects)
+        columnar_bytes = catalog.memory_footprint()
+        return {
+            "books": len(catalog),
+            "object_bytes": object_bytes,
+            "columnar_bytes": columnar_bytes,
+            "ratio": round(object_bytes / columnar_bytes, 2) if columnar_bytes else 0,
+        }
+
+
+def _unique_size(values, seen):
+    size = 0
+    for value in values:
+        if id(value) not in seen:
+            seen.add(id(value))
+            size += sys.getsizeof(value)
+    return size
+
+
+def _object_footprint(books):
+    """Approximate bytes held by Book objects, their __dict__s and attribute values."""
+    total = sys.getsizeof(books)
+    seen = set()
+    for book in books:
+        total += sys.getsizeof(book) + sys.getsizeof(book.__dict__)
+        total += _unique_size(book.__dict__.values(), seen)
+    return total
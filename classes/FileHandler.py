@@ -1,44 +1,242 @@
+import json
 import os
+import tempfile
+import threading
+from contextlib import contextmanager
 import pandas as pd
+from classes.StorageBackend import CsvBackend, replace_file
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows: only threads of this process are serialized
+    fcntl = None
 
 class FileHandler:
-    def __init__(self, base_dir="data"):
+    LOCK_FILE = ".library.lock"
+    SEQUENCE_FILE = ".library.changes"
+
+    def __init__(self, base_dir="data", backend=None):
+        """
+        `backend` is a StorageBackend; CSV files under base_dir by default.
+        Writes hold an advisory lock on the directory and bump a per-file
+        change sequence, so other processes can tell their data is stale.
+        """
         self.base_dir = os.path.abspath(base_dir)
         if not os.path.exists(self.base_dir):
             print(f"Warning: The directory {self.base_dir} does not exist.")
         else:
             os.makedirs(self.base_dir, exist_ok=True)
+        self.backend = backend if backend is not None else CsvBackend(self.base_dir)
+        self._thread_lock = threading.RLock()
+        self._lock_depth = 0
+        self._lock_file = None
+        self._sequences = {}
+        self._sequences_signature = None
+        # file_name -> (first, last): every change between these sequences was written by this handler
+        self.write_sequences = {}
+
+    @contextmanager
+    def lock(self):
+        """
+        Hold the data directory's exclusive lock, e.g. around a read-modify-write
+        cycle. It is an fcntl lock shared with other processes where available
+        and is re-entrant within a thread.
+        """
+        with self._thread_lock:
+            if self._lock_depth == 0 and fcntl is not None:
+                lock_file = open(self.get_file_path(self.LOCK_FILE), "a")
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                self._lock_file = lock_file
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and self._lock_file is not None:
+                    fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+                    self._lock_file.close()
+                    self._lock_file = None
+
+    def change_sequence(self, file_name):
+        """How often file_name was written through any FileHandler on this directory; a stat() when unchanged."""
+        file_path = self.get_file_path(self.SEQUENCE_FILE)
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            return 0
+        signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if signature != self._sequences_signature:
+            try:
+                with open(file_path, encoding="utf-8") as sequence_file:
+                    self._sequences = json.load(sequence_file)
+            except (OSError, ValueError) as e:
+                print(f"Error reading {self.SEQUENCE_FILE}: {e}")
+                self._sequences = {}
+            self._sequences_signature = signature
+        return self._sequences.get(file_name, 0)
+
+    def _record_write(self, file_name):
+        """Bump the change sequence of file_name; call while holding lock()."""
+        previous = self.change_sequence(file_name)
+        sequences = dict(self._sequences, **{file_name: previous + 1})
+        fd, temp_path = tempfile.mkstemp(dir=self.base_dir, prefix=f"{self.SEQUENCE_FILE}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as sequence_file:
+                json.dump(sequences, sequence_file)
+            replace_file(temp_path, self.get_file_path(self.SEQUENCE_FILE))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        # Extend the range of our own consecutive writes
+        first, last = self.write_sequences.get(file_name, (previous, previous))
+        self.write_sequences[file_name] = (first if last == previous else previous, previous + 1)
 
     def get_file_path(self, file_name):
         return os.path.join(self.base_dir, file_name)
 
-    def load_csv(self, file_name):
-        file_path = self.get_file_path(file_name)
+    def load_csv(self, file_name, **read_options):
+        """Load a table; CSV files that have not changed since the last load are served from a read cache."""
         try:
-            if os.path.exists(file_path):
-                return pd.read_csv(file_path)
-            else:
-                print(f"File {file_name} does not exist. Returning an empty DataFrame.")
-                return pd.DataFrame()
+            return self.backend.load(file_name, **read_options)
         except Exception as e:
             print(f"Error loading {file_name}: {e}")
             return pd.DataFrame()
 
+    def iter_csv(self, file_name, chunksize, **read_options):
+        """Yield a CSV file as DataFrames of at most `chunksize` rows."""
+        return self.backend.iter_chunks(file_name, chunksize, **read_options)
+
     def save_csv(self, file_name, data):
-        file_path = self.get_file_path(file_name)
+        """Replace a table; returns False if it could not be written."""
         try:
-            data.to_csv(file_path, index=False)
+            with self.lock():
+                self.backend.save(file_name, data)
+                self._record_write(file_name)
+            return True
         except Exception as e:
             print(f"Error saving {file_name}: {e}")
+            return False
 
     def update_file(self, file_name, new_data):
-        file_path = self.get_file_path(file_name)
         try:
-            existing_data = self.load_csv(file_name)
-            if not existing_data.empty:
-                updated_data = pd.concat([existing_data, new_data]).drop_duplicates(ignore_index=True)
-            else:
-                updated_data = new_data
-            self.save_csv(file_name, updated_data)
+            with self.lock():
+                if self.supports_row_updates():
+                    self.backend.write_rows(file_name, upserts=new_data.to_dict("records"))
+                    self._record_write(file_name)
+                    return
+                existing_data = self.load_csv(file_name)
+                if not existing_data.empty:
+                    updated_data = pd.concat([existing_data, new_data]).drop_duplicates(ignore_index=True)
+                else:
+                    updated_data = new_data
+                self.save_csv(file_name, updated_data)
         except Exception as e:
             print(f"Error updating file {file_name}: {e}")
+
+    def append_csv(self, file_name, data):
+        """Append rows to a table without rewriting the rows already stored."""
+        try:
+            with self.lock():
+                self.backend.append(file_name, data)
+                self._record_write(file_name)
+            return True
+        except Exception as e:
+            print(f"Error appending to {file_name}: {e}")
+            return False
+
+    def signature(self, file_name):
+        """Changes whenever the table changes; None when the backend cannot tell."""
+        try:
+            return self.backend.signature(file_name)
+        except Exception as e:
+            print(f"Error checking {file_name}: {e}")
+            return None
+
+    def supports_row_updates(self):
+        """True when the backend can update, delete and search single rows."""
+        return self.backend.supports_rows
+
+    def write_rows(self, file_name, upserts=(), deletes=()):
+        """Apply row-level upserts and deletes (row-capable backends only)."""
+        try:
+            with self.lock():
+                self.backend.write_rows(file_name, upserts, deletes)
+                self._record_write(file_name)
+            return True
+        except Exception as e:
+            print(f"Error updating rows of {file_name}: {e}")
+            return False
+
+    def search_rows(self, file_name, column, query=None, low=None, high=None):
+        """Search a table on the backend (row-capable backends only)."""
+        return self.backend.search(file_name, column, query=query, low=low, high=high)
+
+    def append_records(self, file_name, records):
+        """Append JSON records to a journal file and fsync them to disk."""
+        file_path = self.get_file_path(file_name)
+        try:
+            with self.lock(), open(file_path, "a", encoding="utf-8") as journal:
+                for record in records:
+                    journal.write(json.dumps(record, separators=(",", ":")) + "\n")
+                journal.flush()
+                os.fsync(journal.fileno())
+                self._record_write(file_name)
+            return True
+        except Exception as e:
+            print(f"Error appending to {file_name}: {e}")
+            return False
+
+    def replace_records(self, file_name, records):
+        """Atomically replace a journal file with the given JSON records, e.g. to compact it."""
+        file_path = self.get_file_path(file_name)
+        try:
+            with self.lock():
+                fd, temp_path = tempfile.mkstemp(dir=self.base_dir, prefix=f".{file_name}.", suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "w", encoding="utf-8") as journal:
+                        for record in records:
+                            journal.write(json.dumps(record, separators=(",", ":")) + "\n")
+                        journal.flush()
+                        os.fsync(journal.fileno())
+                    replace_file(temp_path, file_path)
+                except BaseException:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+                    raise
+                self._record_write(file_name)
+            return True
+        except Exception as e:
+            print(f"Error replacing {file_name}: {e}")
+            return False
+
+    def load_records(self, file_name):
+        """Load the JSON records of a journal file, skipping a torn last line."""
+        file_path = self.get_file_path(file_name)
+        records = []
+        if not os.path.exists(file_path):
+            return records
+        try:
+            with open(file_path, "r", encoding="utf-8") as journal:
+                for line in journal:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        print(f"Skipping incomplete record in {file_name}.")
+        except Exception as e:
+            print(f"Error loading {file_name}: {e}")
+        return records
+
+    def truncate_file(self, file_name):
+        """Empty a file, e.g. a journal after a checkpoint."""
+        file_path = self.get_file_path(file_name)
+        try:
+            with self.lock(), open(file_path, "w", encoding="utf-8") as journal:
+                journal.flush()
+                os.fsync(journal.fileno())
+                self._record_write(file_name)
+        except Exception as e:
+            print(f"Error truncating {file_name}: {e}")
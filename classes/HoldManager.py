@@ -0,0 +1,216 @@
+import heapq
+import threading
+import time
+from contextlib import nullcontext
+
+
+class HoldManager:
+    """
+    Reserves returned copies for the user notified from the waiting list
+    until a deadline. Deadlines live in one heap, so expiring a hold and
+    passing the copy to the next waiting user costs O(log n) no matter how
+    many holds are outstanding; a single timer thread sleeps until the
+    earliest deadline instead of polling books.
+    """
+    HOLDS_FILE = "holds.journal"
+
+    def __init__(self, hold_seconds=48 * 60 * 60, on_change=None, clock=time.time, lock_for=None,
+                 file_handler=None):
+        """
+        `on_change(book)` is called after an expired hold moved the copy on,
+        e.g. to save the catalog; `lock_for(book)` returns the lock to hold
+        while taking the next user off the book's waiting list. With a
+        FileHandler, holds are journaled to holds.journal and survive a
+        restart through restore().
+        """
+        self.hold_seconds = hold_seconds
+        self.on_change = on_change
+        self.lock_for = lock_for
+        self.clock = clock
+        self.file_handler = file_handler
+        self._journal_length = 0
+        self._condition = threading.Condition()
+        self._heap = []  # (deadline, sequence, book_key, username, book); stale entries are skipped
+        self._holds = {}  # book_key -> {username: deadline}
+        self._sequence = 0
+        self._thread = None
+        self._stopped = False
+
+    @staticmethod
+    def _key(book):
+        return book.title, book.author
+
+    def place(self, book, username):
+        """Hold one copy of `book` for `username`; returns the deadline."""
+        deadline = self.clock() + self.hold_seconds
+        key = self._key(book)
+        with self._condition:
+            self._push(key, username, deadline, book)
+            self._journal([self._placed(key, username, deadline)])
+        return deadline
+
+    def _push(self, key, username, deadline, book):
+        self._holds.setdefault(key, {})[username] = deadline
+        self._sequence += 1
+        heapq.heappush(self._heap, (deadline, self._sequence, key, username, book))
+        if self._heap[0][1] == self._sequence:
+            # New earliest deadline: wake the timer thread
+            self._condition.notify()
+
+    @staticmethod
+    def _placed(key, username, deadline):
+        return {"event": "place", "title": key[0], "author": key[1], "username": username, "deadline": deadline}
+
+    def _journal(self, events):
+        """Append hold events; call while holding the condition so the file keeps their order."""
+        if self.file_handler is None or not events:
+            return
+        if not self.file_handler.append_records(self.HOLDS_FILE, events):
+            print("Holds could not be saved; they will be lost on restart.")
+            return
+        self._journal_length += len(events)
+        live = sum(len(holds) for holds in self._holds.values())
+        if self._journal_length > 2 * live + 1000:
+            # Mostly released holds: rewrite the file with the live ones only
+            placed = [self._placed(key, username, deadline)
+                      for key, holds in self._holds.items() for username, deadline in holds.items()]
+            if self.file_handler.replace_records(self.HOLDS_FILE, placed):
+                self._journal_length = len(placed)
+
+    def restore(self, find_book):
+        """
+        Reload the holds saved in holds.journal, e.g. after a restart;
+        `find_book(title, author)` resolves the held books. Holds whose
+        deadline passed meanwhile expire on the next expire_due().
+        Returns how many holds were restored.
+        """
+        if self.file_handler is None:
+            return 0
+        saved = {}
+        events = self.file_handler.load_records(self.HOLDS_FILE)
+        for event in events:
+            key = (event.get("title"), event.get("author"))
+            if event.get("event") == "place":
+                saved.setdefault(key, {})[event.get("username")] = event.get("deadline")
+            elif event.get("event") == "release":
+                saved.get(key, {}).pop(event.get("username"), None)
+        restored = 0
+        with self._condition:
+            self._heap = []
+            self._holds = {}
+            self._journal_length = len(events)
+            for key, holds in saved.items():
+                book = find_book(*key) if holds else None
+                if book is None:
+                    continue
+                for username, deadline in holds.items():
+                    self._push(key, username, deadline, book)
+                    restored += 1
+        return restored
+
+    def claim(self, book, username):
+        """Release the user's hold on `book` so they can borrow it; False if they hold no copy."""
+        key = self._key(book)
+        with self._condition:
+            holds = self._holds.get(key)
+            if not holds or username not in holds or holds[username] <= self.clock():
+                return False
+            self._journal([self._remove(key, username)])
+            return True
+
+    def cancel(self, book, username):
+        """Give up a hold; the copy moves on to the next waiting user."""
+        with self._condition:
+            if username not in self._holds.get(self._key(book), {}):
+                return False
+            self._journal([self._remove(self._key(book), username)])
+        self._advance(book, username)
+        return True
+
+    def has_hold(self, book, username):
+        """True if `username` holds an unexpired copy of `book`."""
+        with self._condition:
+            deadline = self._holds.get(self._key(book), {}).get(username)
+            return deadline is not None and deadline > self.clock()
+
+    def held_copies(self, book):
+        """Number of copies of `book` reserved by unexpired holds."""
+        with self._condition:
+            now = self.clock()
+            return len([deadline for deadline in self._holds.get(self._key(book), {}).values() if deadline > now])
+
+    def holder_deadline(self, book, username):
+        """Deadline of the user's hold on `book`, or None."""
+        with self._condition:
+            return self._holds.get(self._key(book), {}).get(username)
+
+    def __len__(self):
+        with self._condition:
+            return sum(len(holds) for holds in self._holds.values())
+
+    def _remove(self, key, username):
+        holds = self._holds[key]
+        del holds[username]
+        if not holds:
+            del self._holds[key]
+        return {"event": "release", "title": key[0], "author": key[1], "username": username}
+
+    def _pop_due(self, now):
+        """Remove and return (book, username) of every hold whose deadline passed."""
+        due, released = [], []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, _, key, username, book = heapq.heappop(self._heap)
+            if self._holds.get(key, {}).get(username) == deadline:
+                released.append(self._remove(key, username))
+                due.append((book, username))
+        self._journal(released)
+        return due
+
+    def expire_due(self, now=None):
+        """Expire the holds that are past their deadline; returns how many expired."""
+        with self._condition:
+            due = self._pop_due(self.clock() if now is None else now)
+        for book, username in due:
+            self._advance(book, username)
+        return len(due)
+
+    def _advance(self, book, username):
+        with self.lock_for(book) if self.lock_for is not None else nullcontext():
+            next_user = book.waiting_list_manager.remove_from_waiting_list()
+            if next_user:
+                self.place(book, next_user)
+        if next_user:
+            print(f"Hold on '{book.title}' for {username} ended. Now held for {next_user}.")
+        else:
+            print(f"Hold on '{book.title}' for {username} ended. The copy is available.")
+        if self.on_change is not None:
+            self.on_change(book)
+
+    def start(self):
+        """Expire holds in a background thread as their deadlines pass."""
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name="HoldManager", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._condition:
+            thread, self._thread = self._thread, None
+            self._stopped = True
+            self._condition.notify()
+        if thread is not None:
+            thread.join()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    delay = self._heap[0][0] - self.clock() if self._heap else None
+                    if delay is not None and delay <= 0:
+                        break
+                    self._condition.wait(delay)
+                if self._stopped:
+                    return
+            self.expire_due()
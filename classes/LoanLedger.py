@@ -0,0 +1,173 @@
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import namedtuple
+
+from classes.FileHandler import FileHandler
+
+Loan = namedtuple("Loan", ["loan_id", "title", "author", "username", "loaned_at", "due"])
+
+
+class LoanLedger:
+    """
+    Who holds which copy. Loans and returns are appended as events to
+    loans.journal through FileHandler and replayed on startup, and again
+    whenever another process wrote the file; open loans are indexed by
+    user and by book, and their due dates are kept sorted, so overdue
+    queries cost O(log n + k).
+    """
+    LEDGER_FILE = "loans.journal"
+
+    def __init__(self, file_handler=None, loan_days=14, clock=time.time):
+        self.file_handler = file_handler if file_handler is not None else FileHandler()
+        self.loan_seconds = loan_days * 24 * 60 * 60
+        self.clock = clock
+        self._lock = threading.RLock()
+        self._loans = {}  # loan_id -> open Loan
+        self._by_user = {}  # username -> {loan_id: Loan}, oldest first
+        self._by_book = {}  # (title, author) -> {loan_id: Loan}, oldest first
+        self._due = []  # Sorted (due, loan_id) of the open loans
+        self._next_id = 0
+        self._seen_sequence = None  # Change sequence of the event file when it was last read or written
+        self.load()
+
+    def load(self):
+        """Rebuild the open loans from the event file."""
+        with self._lock:
+            self._seen_sequence = self.file_handler.change_sequence(self.LEDGER_FILE)
+            self._loans.clear()
+            self._by_user.clear()
+            self._by_book.clear()
+            self._due = []
+            self._next_id = 0
+            for event in self.file_handler.load_records(self.LEDGER_FILE):
+                if event.get("event") == "loan":
+                    self._open(Loan(event["loan_id"], event["title"], event["author"], event["username"],
+                                    event["loaned_at"], event["due"]))
+                    self._next_id = max(self._next_id, event["loan_id"] + 1)
+                elif event.get("event") == "return" and event.get("loan_id") in self._loans:
+                    self._close(self._loans[event["loan_id"]])
+                elif event.get("event") == "next_id":
+                    # Written by compact(), so ids of dropped loans are not handed out again
+                    self._next_id = max(self._next_id, event["loan_id"])
+
+    def _refresh(self):
+        """Reload if another process wrote the event file since this one last read or wrote it."""
+        if self.file_handler.change_sequence(self.LEDGER_FILE) != self._seen_sequence:
+            self.load()
+
+    def _append(self, events):
+        """Append events; call while holding the file lock after _refresh(), so no other write is missed."""
+        if not self.file_handler.append_records(self.LEDGER_FILE, events):
+            return False
+        self._seen_sequence = self.file_handler.change_sequence(self.LEDGER_FILE)
+        return True
+
+    def _open(self, loan):
+        self._loans[loan.loan_id] = loan
+        self._by_user.setdefault(loan.username, {})[loan.loan_id] = loan
+        self._by_book.setdefault((loan.title, loan.author), {})[loan.loan_id] = loan
+        insort(self._due, (loan.due, loan.loan_id))
+
+    def _close(self, loan):
+        del self._loans[loan.loan_id]
+        for index, key in ((self._by_user, loan.username), (self._by_book, (loan.title, loan.author))):
+            loans = index[key]
+            del loans[loan.loan_id]
+            if not loans:
+                del index[key]
+        del self._due[bisect_left(self._due, (loan.due, loan.loan_id))]
+
+    def record_loans(self, items):
+        """Open a loan for each (book, username) with one write; returns the new loans."""
+        # Ids are picked under the file lock after catching up, so two processes never pick the same one
+        with self._lock, self.file_handler.lock():
+            self._refresh()
+            now = self.clock()
+            loans = []
+            for book, username in items:
+                loans.append(Loan(self._next_id, book.title, book.author, username, now, now + self.loan_seconds))
+                self._next_id += 1
+            events = [dict(loan._asdict(), event="loan") for loan in loans]
+            if loans and not self._append(events):
+                self._next_id -= len(loans)
+                return []
+            for loan in loans:
+                self._open(loan)
+            return loans
+
+    def record_loan(self, book, username):
+        """Open a loan of `book` for `username`; returns the Loan, or None if it could not be stored."""
+        loans = self.record_loans([(book, username)])
+        return loans[0] if loans else None
+
+    def record_returns(self, items):
+        """
+        Close the user's oldest open loan of the book for each (book,
+        username) with one write. Items without such a loan are skipped; a
+        copy on loan to someone else is never closed. Returns the closed loans.
+        """
+        with self._lock, self.file_handler.lock():
+            self._refresh()
+            closing = {}
+            for book, username in items:
+                loan = self._oldest_open(book, username, closing)
+                if loan is not None:
+                    closing[loan.loan_id] = loan
+            now = self.clock()
+            events = [{"event": "return", "loan_id": loan_id, "returned_at": now} for loan_id in closing]
+            if events and not self._append(events):
+                return []
+            for loan in closing.values():
+                self._close(loan)
+            return list(closing.values())
+
+    def record_return(self, book, username=None):
+        """Close the user's loan of `book`; returns the closed Loan, or None if they have none."""
+        loans = self.record_returns([(book, username)])
+        return loans[0] if loans else None
+
+    def _oldest_open(self, book, username, excluded):
+        for loan in self._by_user.get(username, {}).values():
+            if (loan.title, loan.author) == (book.title, book.author) and loan.loan_id not in excluded:
+                return loan
+        return None
+
+    def loans_of(self, username):
+        """Open loans of a user, oldest first."""
+        with self._lock:
+            self._refresh()
+            return list(self._by_user.get(username, {}).values())
+
+    def loans_of_book(self, book):
+        """Open loans of a book, oldest first."""
+        with self._lock:
+            self._refresh()
+            return list(self._by_book.get((book.title, book.author), {}).values())
+
+    def due_before(self, when):
+        """Open loans due before `when`, earliest first."""
+        with self._lock:
+            self._refresh()
+            end = bisect_left(self._due, (when,))
+            return [self._loans[loan_id] for _, loan_id in self._due[:end]]
+
+    def overdue(self, now=None):
+        """Open loans past their due date, earliest first."""
+        return self.due_before(self.clock() if now is None else now)
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._loans)
+
+    def compact(self):
+        """Atomically replace the event file with the open loans only."""
+        with self._lock, self.file_handler.lock():
+            self._refresh()
+            events = [dict(loan._asdict(), event="loan") for loan in self._loans.values()]
+            events.append({"event": "next_id", "loan_id": self._next_id})
+            if not self.file_handler.replace_records(self.LEDGER_FILE, events):
+                return False
+            self._seen_sequence = self.file_handler.change_sequence(self.LEDGER_FILE)
+            return True
@@ -1,30 +1,143 @@
+import atexit
+import queue
+import threading
+import time
+
+from classes.MetricsRegistry import MetricsRegistry
+
+# Map custom actions to log messages
+LOG_MESSAGES = {
+    "add_book": "book added",
+    "remove_book": "book removed",
+    "perform_search": "Search book",
+    "borrow_book": "book borrowed",
+    "return_book": "book returned",
+    "borrow_many": "books borrowed",
+    "return_many": "books returned",
+    "log_out": "log out",
+    "log_in": "logged in",
+    "register": "registered",
+    "import_users": "users imported",
+    "display_popular_books": "Popular books display",
+}
+
+
+class QueuedLogWriter(threading.Thread):
+    """Background thread that appends queued log lines to a file in batches."""
+    _STOP = object()
+
+    def __init__(self, log_file, batch_size=100, flush_interval=0.5):
+        super().__init__(name=f"QueuedLogWriter({log_file})", daemon=True)
+        self.log_file = log_file
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+
+    def write(self, message):
+        self.queue.put(message)
+
+    def run(self):
+        stopping = False
+        while not stopping:
+            try:
+                batch = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if self._STOP in batch:
+                stopping = True
+                batch = [message for message in batch if message is not self._STOP]
+            self._flush(batch)
+
+    def _flush(self, batch):
+        if not batch:
+            return
+        try:
+            with open(self.log_file, "a") as log_file:
+                log_file.write("".join(batch))
+        except Exception as e:
+            print(f"Error writing to {self.log_file}: {e}")
+
+    def close(self):
+        """Flush everything queued so far and stop the thread."""
+        self.queue.put(self._STOP)
+        self.join()
+
+
 class Logger:
+    # Queued writers are shared by every Logger instance writing to the same file
+    _writers = {}
+    _writers_lock = threading.Lock()
+    _local = threading.local()
+    # Only the outermost decorated call of a nested chain is logged unless this is True
+    log_nested = False
+    # Call counts and latencies of every decorated action
+    metrics = MetricsRegistry()
+
     def __init__(self, log_file="library_logs.txt"):
         self.log_file = log_file
 
+    @classmethod
+    def enable_queue(cls, log_file="library_logs.txt", batch_size=100, flush_interval=0.5):
+        """Write log_file through a background thread; decorated calls only enqueue."""
+        with cls._writers_lock:
+            if log_file not in cls._writers:
+                writer = QueuedLogWriter(log_file, batch_size, flush_interval)
+                writer.start()
+                cls._writers[log_file] = writer
+
+    @classmethod
+    def shutdown(cls):
+        """Flush and stop all queued writers; later log lines are written directly."""
+        with cls._writers_lock:
+            writers = list(cls._writers.values())
+            cls._writers.clear()
+        for writer in writers:
+            writer.close()
+
+    @classmethod
+    def stats(cls):
+        """Per-action call counts, error counts and latency percentiles."""
+        return cls.metrics.stats()
+
+    @classmethod
+    def export_stats(cls, path, interval=None):
+        """Write the stats to a JSON file now, or every `interval` seconds if given."""
+        if interval is None:
+            cls.metrics.export(path)
+        else:
+            cls.metrics.start_export(path, interval)
+
+    def _write(self, log_message):
+        writer = self._writers.get(self.log_file)
+        if writer is not None:
+            writer.write(log_message)
+            return
+        with open(self.log_file, "a") as log_file:
+            log_file.write(log_message)
+
     def log_action(self, func):
         def wrapper(*args, **kwargs):
+            depth = getattr(Logger._local, "depth", 0)
+            should_log = Logger.log_nested or depth == 0
+            Logger._local.depth = depth + 1
+            start = time.perf_counter()
             try:
                 # Call the original function and get the result
                 result = func(*args, **kwargs)
+                succeeded = bool(result)
+                Logger.metrics.record(func.__qualname__, time.perf_counter() - start, failed=not succeeded)
+                if not should_log:
+                    return result
                 action_name = func.__name__
 
-                # Map custom actions to log messages
-                log_messages = {
-                    "add_book": "book added",
-                    "remove_book": "book removed",
-                    "perform_search": "Search book",
-                    "borrow_book": "book borrowed",
-                    "return_book": "book returned",
-                    "log_out": "log out",
-                    "log_in": "logged in",
-                    "register": "registered",
-                    "display_popular_books": "Popular books display",
-                }
-
                 # Default action log message
-                action = log_messages.get(action_name, action_name.replace('_', ' ').title())
-                status = "successfully" if result else "fail"
+                action = LOG_MESSAGES.get(action_name, action_name.replace('_', ' ').title())
+                status = "successfully" if succeeded else "fail"
 
                 # Special case for search action
                 if action_name == "perform_search":
@@ -36,14 +149,19 @@ class Logger:
                     log_message = f"{action} {status}\n"
 
                 # Write the log message to the log file
-                with open(self.log_file, "a") as log_file:
-                    log_file.write(log_message)
+                self._write(log_message)
 
                 return result
             except Exception as e:
-                action = func.__name__.replace('_', ' ').title()
-                log_message = f"{action} failed: {str(e)}\n"
-                with open(self.log_file, "a") as log_file:
-                    log_file.write(log_message)
+                Logger.metrics.record(func.__qualname__, time.perf_counter() - start, error=True)
+                if should_log:
+                    action = func.__name__.replace('_', ' ').title()
+                    log_message = f"{action} failed: {str(e)}\n"
+                    self._write(log_message)
                 raise
+            finally:
+                Logger._local.depth = depth
         return wrapper
+
+
+atexit.register(Logger.shutdown)
@@ -0,0 +1,84 @@
+import json
+import threading
+from collections import deque
+
+
+class MetricsRegistry:
+    """
+    In-process call counts, error counts and latency percentiles per action.
+    Percentiles are computed over the most recent `sample_size` calls.
+    """
+
+    def __init__(self, sample_size=1024):
+        self.sample_size = sample_size
+        self._lock = threading.Lock()
+        self._actions = {}
+        self._export_stop = None
+
+    def record(self, action, seconds, error=False, failed=False):
+        """Record one call; `error` means it raised, `failed` that it returned a falsy result."""
+        with self._lock:
+            metrics = self._actions.get(action)
+            if metrics is None:
+                metrics = {"calls": 0, "errors": 0, "failures": 0, "total": 0.0,
+                           "max": 0.0, "samples": deque(maxlen=self.sample_size)}
+                self._actions[action] = metrics
+            metrics["calls"] += 1
+            metrics["errors"] += error
+            metrics["failures"] += failed
+            metrics["total"] += seconds
+            metrics["max"] = max(metrics["max"], seconds)
+            metrics["samples"].append(seconds)
+
+    def stats(self):
+        """Return {action: {calls, errors, failures, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}}."""
+        with self._lock:
+            snapshot = {action: dict(metrics, samples=sorted(metrics["samples"]))
+                        for action, metrics in self._actions.items()}
+        return {action: {
+            "calls": metrics["calls"],
+            "errors": metrics["errors"],
+            "failures": metrics["failures"],
+            "mean_ms": round(metrics["total"] / metrics["calls"] * 1000, 3),
+            "p50_ms": _percentile(metrics["samples"], 50),
+            "p95_ms": _percentile(metrics["samples"], 95),
+            "p99_ms": _percentile(metrics["samples"], 99),
+            "max_ms": round(metrics["max"] * 1000, 3),
+        } for action, metrics in snapshot.items()}
+
+    def reset(self):
+        with self._lock:
+            self._actions.clear()
+
+    def export(self, path):
+        """Write the current stats to a JSON file."""
+        try:
+            with open(path, "w") as stats_file:
+                json.dump(self.stats(), stats_file, indent=2, sort_keys=True)
+        except Exception as e:
+            print(f"Error exporting metrics to {path}: {e}")
+
+    def start_export(self, path, interval=60):
+        """Export the stats to `path` every `interval` seconds until stop_export()."""
+        self.stop_export()
+        stop = threading.Event()
+        self._export_stop = stop
+
+        def run():
+            while not stop.wait(interval):
+                self.export(path)
+
+        threading.Thread(target=run, name="MetricsExport", daemon=True).start()
+
+    def stop_export(self):
+        if self._export_stop is not None:
+            self._export_stop.set()
+            self._export_stop = None
+
+
+def _percentile(sorted_samples, percent):
+    """Nearest-rank percentile in milliseconds."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(0, -(-len(sorted_samples) * percent // 100) - 1)
+    return round(sorted_samples[int(rank)] * 1000, 3)
@@ -0,0 +1,149 @@
+import atexit
+import queue
+import socket
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import namedtuple
+
+Notification = namedtuple("Notification", ["username", "message"])
+
+
+class NotificationSink(ABC):
+    """Where the dispatcher delivers notifications; deliver() raises to have a batch retried."""
+
+    @abstractmethod
+    def deliver(self, notifications):
+        pass
+
+
+class PrintSink(NotificationSink):
+    """Prints notifications like Observer.update does."""
+
+    def deliver(self, notifications):
+        for notification in notifications:
+            print(f"Notification for {notification.username}: {notification.message}")
+
+
+class FileSink(NotificationSink):
+    """Appends one tab-separated line per notification to a file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def deliver(self, notifications):
+        lines = "".join(f"{n.username}\t{n.message}\n" for n in notifications)
+        with self._lock, open(self.path, "a", encoding="utf-8") as sink_file:
+            sink_file.write(lines)
+
+
+class SocketSink(NotificationSink):
+    """Sends each batch as tab-separated lines over a new TCP connection, e.g. to a local mail/SMS stand-in."""
+
+    def __init__(self, host, port, timeout=5):
+        self.address = (host, port)
+        self.timeout = timeout
+
+    def deliver(self, notifications):
+        payload = "".join(f"{n.username}\t{n.message}\n" for n in notifications).encode("utf-8")
+        with socket.create_connection(self.address, timeout=self.timeout) as connection:
+            connection.sendall(payload)
+
+
+class NotificationDispatcher:
+    """
+    Delivers notifications in the background: notify() only puts them on a
+    bounded queue, and a pool of worker threads hands them to the sink in
+    batches, retrying failed batches with exponential backoff.
+    """
+    _STOP = object()
+
+    def __init__(self, sink=None, workers=2, max_queue=1000, batch_size=50, max_retries=3, backoff=0.1):
+        self.sink = sink if sink is not None else PrintSink()
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.queue = queue.Queue(maxsize=max_queue)
+        self._stats_lock = threading.Lock()
+        self._stats = {"queued": 0, "delivered": 0, "failed": 0, "dropped": 0, "retries": 0}
+        # Guards _closed, so nothing is queued behind the workers' stop markers
+        self._close_lock = threading.Lock()
+        self._closed = False
+        self._workers = [threading.Thread(target=self._run, name=f"NotificationWorker-{i}", daemon=True)
+                         for i in range(workers)]
+        for worker in self._workers:
+            worker.start()
+        atexit.register(self.close)
+
+    def notify(self, username, message):
+        """Queue a notification without waiting for delivery; returns False if the queue is full or closed."""
+        with self._close_lock:
+            if self._closed:
+                print(f"Notification dispatcher closed. Dropping notification for {username}.")
+                self._count("dropped")
+                return False
+            try:
+                self.queue.put_nowait(Notification(username, message))
+            except queue.Full:
+                print(f"Notification queue full. Dropping notification for {username}.")
+                self._count("dropped")
+                return False
+        self._count("queued")
+        return True
+
+    def _count(self, name, amount=1):
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size and batch[-1] is not self._STOP:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = batch[-1] is self._STOP
+            notifications = batch[:-1] if stopping else batch
+            if notifications:
+                self._deliver(notifications)
+            for _ in batch:
+                self.queue.task_done()
+            if stopping:
+                return
+
+    def _deliver(self, notifications):
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.sink.deliver(notifications)
+                self._count("delivered", len(notifications))
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    print(f"Error delivering {len(notifications)} notifications: {e}")
+                    self._count("failed", len(notifications))
+                    return
+                self._count("retries")
+                time.sleep(self.backoff * 2 ** attempt)
+
+    def flush(self):
+        """Block until every queued notification was delivered or given up on; returns at once after close()."""
+        if self._workers:
+            self.queue.join()
+
+    def close(self):
+        """Deliver what is queued and stop the workers; later notifications are dropped."""
+        with self._close_lock:
+            self._closed = True
+        workers = [worker for worker in self._workers if worker.is_alive()]
+        for _ in workers:
+            self.queue.put(self._STOP)
+        for worker in workers:
+            worker.join()
+        self._workers = []
+
+    def stats(self):
+        """Counts of queued, delivered, failed and dropped notifications and of retried batches."""
+        with self._stats_lock:
+            return dict(self._stats)
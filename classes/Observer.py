@@ -1,8 +1,12 @@
 class Observer:
-    def __init__(self, username):
-        """Initialize an observer with a username."""
+    def __init__(self, username, dispatcher=None):
+        """Initialize an observer with a username; with a NotificationDispatcher, updates are delivered in the background."""
         self.username = username
+        self.dispatcher = dispatcher
 
     def update(self, message):
         """Receive and handle a notification."""
+        if self.dispatcher is not None:
+            self.dispatcher.notify(self.username, message)
+            return
         print(f"Notification for {self.username}: {message}")
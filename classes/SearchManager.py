@@ -6,29 +6,50 @@ from classes.SearchStrategic import (
     GenreStrategic,
     YearStrategic,
     CopiesAvailableStrategic,
+    YearRangeStrategic,
+    CopiesAvailableRangeStrategic,
 )
 from classes.Logger import Logger
 
 class SearchManager:
-    def __init__(self, book_manager, logger):
+    def __init__(self, book_manager, logger, popular_limit=10, cache=None):
         self.book_manager = book_manager
         self.logger = logger
+        self.cache = cache  # Optional ResultCache
         self.filters = {
             "all": AllBooksFilter(),
-            "popular": PopularBooksFilter(),
+            "popular": PopularBooksFilter(popular_limit),
             "available": AvailableBooksFilter(),
             "loaned": LoanedBooksFilter(),
         }
 
+    def _index(self, name):
+        """Return the book manager's CatalogIndex called `name`, if it maintains one."""
+        indexes = getattr(self.book_manager, "indexes", None)
+        return indexes.get(name) if isinstance(indexes, dict) else None
+
+    def _cached(self, key, compute):
+        """Serve `key` from the result cache while the catalog version is unchanged."""
+        version = getattr(self.book_manager, "version", None)
+        if self.cache is None or not isinstance(version, int):
+            return compute()
+        results = self.cache.get(key, version)
+        if results is None:
+            results = list(compute())
+            self.cache.put(key, version, results)
+        return results
+
     @Logger().log_action
     def perform_search(self, query, search_type):
         """Perform a search using a specified strategy and return an iterator for results."""
         strategy_map = {
-            "title": TitleStrategic(self.logger),
-            "author": AuthorStrategic(self.logger),
-            "genre": GenreStrategic(self.logger),
-            "year": YearStrategic(self.logger),
-            "copies_available": CopiesAvailableStrategic(self.logger),
+            "title": TitleStrategic(self.logger, self._index("title")),
+            "author": AuthorStrategic(self.logger, self._index("author")),
+            "genre": GenreStrategic(self.logger, self._index("genre")),
+            "year": YearStrategic(self.logger, self._index("year")),
+            "copies_available": CopiesAvailableStrategic(self.logger, self._index("copies_available")),
+            "year_range": YearRangeStrategic(self.logger, self._index("year")),
+            "copies_available_range": CopiesAvailableRangeStrategic(self.logger, self._index("copies_available")),
         }
 
         # Select the search strategy
@@ -36,8 +57,8 @@ class SearchManager:
         if not search_strategy:
             raise ValueError(f"Invalid search type: {search_type}")
 
-        books = self.book_manager.books
-        results = search_strategy.search(books, query)
+        results = self._cached(("search", query, search_type),
+                               lambda: search_strategy.search(self.book_manager.books, query))
 
         # Always return a BookIterator (even if the results list is empty)
         return BookIterator(results)
@@ -48,6 +69,10 @@ class SearchManager:
         filter_strategy = self.filters.get(filter_type)
         if not filter_strategy:
             raise ValueError("Invalid filter type. Use 'all', 'popular', 'available', or 'loaned'.")
+        if isinstance(filter_strategy, PopularBooksFilter):
+            # Looked up per call, so an index enabled after construction is used too
+            filter_strategy.index = self._index("popularity")
 
-        filtered_books = filter_strategy.filter(self.book_manager.books)
+        filtered_books = self._cached(("display", filter_type),
+                                      lambda: filter_strategy.filter(self.book_manager.books))
         return BookIterator(filtered_books)
@@ -1,10 +1,44 @@
+import re
 from abc import ABC, abstractmethod
 from classes.Logger import Logger
 from classes.BookIterator import BookIterator  # Assuming BookIterator is implemented
 
+RANGE_PATTERN = re.compile(r"^(>=|<=|>|<)?\s*(\d+)(?:\s*-\s*(\d+))?")
+
+
+def parse_range(query):
+    """
+    Parse a range query into inclusive (low, high) bounds, None meaning open:
+    "1950-1970", ">=3", "<2000", "3 copies" (exact).
+    """
+    match = RANGE_PATTERN.match(str(query).strip())
+    if not match:
+        raise ValueError(f"Invalid range query: {query}")
+    operator, first, second = match.groups()
+    first = int(first)
+    if second is not None and operator is None:
+        return first, int(second)
+    if operator == ">=":
+        return first, None
+    if operator == ">":
+        return first + 1, None
+    if operator == "<=":
+        return None, first
+    if operator == "<":
+        return None, first - 1
+    return first, first
+
+
+def _in_range(value, low, high):
+    return (low is None or value >= low) and (high is None or value <= high)
+
+
 class SearchStrategic(ABC):
-    def __init__(self, logger):
+    # Scans are lazy but run over a snapshot of the catalog, so books added, swapped or
+    # removed before the results are read do not skip or repeat entries
+    def __init__(self, logger, index=None):
         self.logger = logger
+        self.index = index
 
     @Logger().log_action
     def search(self, books, query):
@@ -21,24 +55,55 @@ class SearchStrategic(ABC):
 
 class TitleStrategic(SearchStrategic):
     def _perform_search(self, books, query):
-        return [book for book in books if query.lower() in book.title.lower()]
+        if self.index is not None:
+            return self.index.search(query)
+        query = query.lower()
+        return (book for book in list(books) if query in book.title.lower())
 
 
 class AuthorStrategic(SearchStrategic):
     def _perform_search(self, books, query):
-        return [book for book in books if query.lower() in book.author.lower()]
+        if self.index is not None:
+            return self.index.search(query)
+        query = query.lower()
+        return (book for book in list(books) if query in book.author.lower())
 
 
 class GenreStrategic(SearchStrategic):
     def _perform_search(self, books, query):
-        return [book for book in books if query.lower() in book.genre.lower()]
+        if self.index is not None:
+            return self.index.search(query)
+        query = query.lower()
+        return (book for book in list(books) if query in book.genre.lower())
 
 
 class YearStrategic(SearchStrategic):
     def _perform_search(self, books, query):
-        return [book for book in books if str(query) == str(book.year)]
+        if self.index is not None:
+            return self.index.range(int(query), int(query)) if str(query).strip().isdigit() else []
+        query = str(query)
+        return (book for book in list(books) if query == str(book.year))
 
 
 class CopiesAvailableStrategic(SearchStrategic):
     def _perform_search(self, books, query):
-        return [book for book in books if book.copies_available == int(query)]
+        if self.index is not None:
+            return self.index.range(int(query), int(query))
+        copies = int(query)
+        return (book for book in list(books) if book.copies_available == copies)
+
+
+class YearRangeStrategic(SearchStrategic):
+    def _perform_search(self, books, query):
+        low, high = parse_range(query)
+        if self.index is not None:
+            return self.index.range(low, high)
+        return (book for book in list(books) if _in_range(book.year, low, high))
+
+
+class CopiesAvailableRangeStrategic(SearchStrategic):
+    def _perform_search(self, books, query):
+        low, high = parse_range(query)
+        if self.index is not None:
+            return self.index.range(low, high)
+        return (book for book in list(books) if _in_range(book.copies_available, low, high))
@@ -0,0 +1,342 @@
+import csv
+import os
+import sqlite3
+import stat
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+
+import pandas as pd
+
+# With copy-on-write (pandas 3+) a shallow copy is enough to keep a cached frame unchanged
+_COPY_ON_WRITE = int(pd.__version__.split(".")[0]) >= 3
+
+# Read once: os.umask() can only be queried by setting it, which is not thread-safe
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def replace_file(temp_path, file_path):
+    """
+    Rename temp_path over file_path. mkstemp creates files readable by the
+    owner only, so the temporary file first gets the permissions of the file
+    it replaces, or the usual ones for a new file.
+    """
+    try:
+        mode = stat.S_IMODE(os.stat(file_path).st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    os.chmod(temp_path, mode)
+    os.replace(temp_path, file_path)
+
+
+class StorageBackend(ABC):
+    """Where FileHandler keeps its tables; names are the original CSV file names."""
+    supports_rows = False
+
+    @abstractmethod
+    def load(self, file_name, **read_options):
+        pass
+
+    @abstractmethod
+    def save(self, file_name, data):
+        pass
+
+    @abstractmethod
+    def iter_chunks(self, file_name, chunksize, **read_options):
+        pass
+
+    def append(self, file_name, data):
+        """Add rows to a table; backends that can should avoid rewriting it."""
+        existing_data = self.load(file_name)
+        self.save(file_name, pd.concat([existing_data, data], ignore_index=True) if not existing_data.empty else data)
+
+    def signature(self, file_name):
+        """A value that changes whenever the table changes, or None when unknown."""
+        return None
+
+
+class CsvBackend(StorageBackend):
+    """
+    One CSV file per table under base_dir, read and written whole. Parsed
+    files are cached per read options and revalidated with a stat() of
+    the file (mtime, size and inode), so unchanged files are not reparsed.
+    """
+
+    def __init__(self, base_dir, cache_reads=True):
+        self.base_dir = base_dir
+        self.cache_reads = cache_reads
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def get_file_path(self, file_name):
+        return os.path.join(self.base_dir, file_name)
+
+    @staticmethod
+    def _signature(file_path):
+        stat = os.stat(file_path)
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    @staticmethod
+    def _cache_key(file_path, read_options):
+        return file_path, tuple(sorted((name, repr(value)) for name, value in read_options.items()))
+
+    def load(self, file_name, **read_options):
+        file_path = self.get_file_path(file_name)
+        if not os.path.exists(file_path):
+            print(f"File {file_name} does not exist. Returning an empty DataFrame.")
+            return pd.DataFrame()
+        if not self.cache_reads:
+            return pd.read_csv(file_path, **read_options)
+        key = self._cache_key(file_path, read_options)
+        # Taken before parsing, so a write during the parse is picked up by the next load
+        signature = self._signature(file_path)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == signature:
+                self.cache_hits += 1
+                return cached[1].copy(deep=not _COPY_ON_WRITE)
+            self.cache_misses += 1
+        data = pd.read_csv(file_path, **read_options)
+        with self._cache_lock:
+            self._cache[key] = (signature, data)
+        return data.copy(deep=not _COPY_ON_WRITE)
+
+    def signature(self, file_name):
+        file_path = self.get_file_path(file_name)
+        return self._signature(file_path) if os.path.exists(file_path) else None
+
+    def invalidate(self, file_name=None):
+        """Drop the cached reads of file_name, or of every file."""
+        file_path = None if file_name is None else self.get_file_path(file_name)
+        with self._cache_lock:
+            for key in [key for key in self._cache if file_path is None or key[0] == file_path]:
+                del self._cache[key]
+
+    def iter_chunks(self, file_name, chunksize, **read_options):
+        file_path = self.get_file_path(file_name)
+        if not os.path.exists(file_path):
+            print(f"File {file_name} does not exist. Nothing to stream.")
+            return
+        with pd.read_csv(file_path, chunksize=chunksize, **read_options) as reader:
+            for chunk in reader:
+                yield chunk
+
+    def save(self, file_name, data):
+        """Write to a temporary file and rename it over the target, so a crash never leaves a truncated file."""
+        file_path = self.get_file_path(file_name)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), prefix=f".{file_name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", newline="") as temp_file:
+                data.to_csv(temp_file, index=False)
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+            replace_file(temp_path, file_path)
+            self.invalidate(file_name)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def append(self, file_name, data):
+        """Append rows to the end of the file, writing the header only when the file is new or empty."""
+        file_path = self.get_file_path(file_name)
+        header = None
+        if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
+            with open(file_path, newline="") as csv_file:
+                header = next(csv.reader(csv_file), None)
+        if header:
+            data = data.reindex(columns=header)
+        try:
+            with open(file_path, "a", newline="") as csv_file:
+                data.to_csv(csv_file, index=False, header=not header)
+                csv_file.flush()
+                os.fsync(csv_file.fileno())
+        finally:
+            self.invalidate(file_name)
+
+
+class SqliteBackend(StorageBackend):
+    """
+    Stores tables in one SQLite database (WAL mode). Books and users get
+    keyed, indexed tables that support row-level upserts, deletes and
+    searches; any other file name becomes a plain table.
+    """
+    supports_rows = True
+    SCHEMAS = {
+        "books": {
+            "columns": [("title", "TEXT NOT NULL"), ("author", "TEXT NOT NULL"), ("is_loaned", "TEXT"),
+                        ("copies", "INTEGER"), ("genre", "TEXT"), ("year", "INTEGER"),
+                        ("loaned_count", "INTEGER"), ("waiting_list", "TEXT"),
+                        ("copies_available", "INTEGER"), ("popularity_count", "INTEGER")],
+            "key": ("title", "author"),
+            "indexes": ("author", "genre", "year", "copies_available"),
+        },
+        "users": {
+            "columns": [("username", "TEXT NOT NULL"), ("password_hash", "TEXT NOT NULL"), ("role", "TEXT")],
+            "key": ("username",),
+            "indexes": (),
+        },
+    }
+
+    def __init__(self, db_path):
+        self.db_path = os.path.abspath(db_path)
+        self._lock = threading.RLock()
+        self._write_count = 0
+        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        # Python's lower() keeps substring search identical to the in-memory strategies
+        self.connection.create_function("py_lower", 1, lambda value: None if value is None else str(value).lower(),
+                                        deterministic=True)
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._lock, self.connection:
+            for table, schema in self.SCHEMAS.items():
+                columns = ", ".join(f"{name} {sql_type}" for name, sql_type in schema["columns"])
+                key = ", ".join(schema["key"])
+                self.connection.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns}, PRIMARY KEY ({key}))")
+                for column in schema["indexes"]:
+                    self.connection.execute(f"CREATE INDEX IF NOT EXISTS {table}_{column} ON {table} ({column})")
+
+    @staticmethod
+    def table_name(file_name):
+        return os.path.splitext(os.path.basename(file_name))[0]
+
+    def exists(self, file_name):
+        with self._lock:
+            row = self.connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                          (self.table_name(file_name),)).fetchone()
+        return row is not None
+
+    def _select(self, file_name):
+        return f'SELECT * FROM "{self.table_name(file_name)}"'
+
+    def load(self, file_name, dtype=None, **read_options):
+        if not self.exists(file_name):
+            print(f"Table {self.table_name(file_name)} does not exist. Returning an empty DataFrame.")
+            return pd.DataFrame()
+        with self._lock:
+            data = pd.read_sql_query(self._select(file_name), self.connection)
+        return self._apply_dtypes(data, dtype)
+
+    def iter_chunks(self, file_name, chunksize, dtype=None, **read_options):
+        if not self.exists(file_name):
+            print(f"Table {self.table_name(file_name)} does not exist. Nothing to stream.")
+            return
+        cursor = self.connection.cursor()
+        cursor.execute(self._select(file_name))
+        columns = [description[0] for description in cursor.description]
+        while True:
+            rows = cursor.fetchmany(chunksize)
+            if not rows:
+                break
+            yield self._apply_dtypes(pd.DataFrame(rows, columns=columns), dtype)
+
+    @staticmethod
+    def _apply_dtypes(data, dtype):
+        if dtype and not data.empty:
+            data = data.astype({column: kind for column, kind in dtype.items() if column in data.columns})
+        return data
+
+    def _columns(self, table, available):
+        schema = self.SCHEMAS[table]
+        return [name for name, _ in schema["columns"] if name in available]
+
+    @staticmethod
+    def _rows(data, columns):
+        values = data[columns].astype(object).where(data[columns].notna(), None)
+        return [tuple(str(value) if isinstance(value, bool) else value for value in row)
+                for row in values.itertuples(index=False)]
+
+    def save(self, file_name, data):
+        table = self.table_name(file_name)
+        with self._lock, self.connection:
+            self._write_count += 1
+            if table not in self.SCHEMAS:
+                data.to_sql(table, self.connection, if_exists="replace", index=False)
+                return
+            columns = self._columns(table, data.columns)
+            self.connection.execute(f"DELETE FROM {table}")
+            self._insert(table, columns, self._rows(data, columns))
+
+    def _insert(self, table, columns, rows):
+        placeholders = ", ".join("?" for _ in columns)
+        self.connection.executemany(
+            f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows
+        )
+
+    def write_rows(self, file_name, upserts=(), deletes=()):
+        """Upsert row dicts and delete rows by key dict in one transaction."""
+        table = self.table_name(file_name)
+        key = self.SCHEMAS[table]["key"]
+        with self._lock, self.connection:
+            self._write_count += 1
+            if deletes:
+                condition = " AND ".join(f"{column} = ?" for column in key)
+                self.connection.executemany(f"DELETE FROM {table} WHERE {condition}",
+                                            [tuple(row[column] for column in key) for row in deletes])
+            if upserts:
+                data = pd.DataFrame(list(upserts))
+                columns = self._columns(table, data.columns)
+                self._insert(table, columns, self._rows(data, columns))
+
+    def append(self, file_name, data):
+        if self.table_name(file_name) in self.SCHEMAS:
+            self.write_rows(file_name, upserts=data.to_dict("records"))
+        else:
+            with self._lock, self.connection:
+                self._write_count += 1
+                data.to_sql(self.table_name(file_name), self.connection, if_exists="append", index=False)
+
+    def signature(self, file_name):
+        """Changes with every write through this backend and every commit from another connection."""
+        with self._lock:
+            data_version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+            return data_version, self._write_count
+
+    def search(self, file_name, column, query=None, low=None, high=None):
+        """
+        Return matching rows as dicts: a case-insensitive substring match
+        when `query` is given, otherwise the inclusive range [low, high].
+        """
+        table = self.table_name(file_name)
+        if column not in dict(self.SCHEMAS[table]["columns"]):
+            raise ValueError(f"Unknown column {column} for {table}.")
+        if query is not None:
+            condition, parameters = f"instr(py_lower({column}), ?) > 0", [str(query).lower()]
+        else:
+            clauses, parameters = [], []
+            if low is not None:
+                clauses.append(f"{column} >= ?")
+                parameters.append(low)
+            if high is not None:
+                clauses.append(f"{column} <= ?")
+                parameters.append(high)
+            condition = " AND ".join(clauses) or "1"
+        with self._lock:
+            cursor = self.connection.execute(f"SELECT * FROM {table} WHERE {condition}", parameters)
+            columns = [description[0] for description in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def migrate_from_csv(self, csv_dir, file_names=("books.csv", "users.csv"), overwrite=False):
+        """Copy existing CSV files into the database; returns {file_name: rows copied}."""
+        migrated = {}
+        for file_name in file_names:
+            csv_path = os.path.join(csv_dir, file_name)
+            if not os.path.exists(csv_path):
+                continue
+            if not overwrite and self.exists(file_name) and not self.load(file_name).empty:
+                print(f"{self.table_name(file_name)} already holds data. Skipping {file_name}.")
+                continue
+            data = pd.read_csv(csv_path)
+            self.save(file_name, data)
+            migrated[file_name] = len(data)
+        return migrated
+
+    def close(self):
+        with self._lock:
+            self.connection.close()
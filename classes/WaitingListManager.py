@@ -1,51 +1,214 @@
+from bisect import bisect_left, insort
+from collections import deque
+from urllib.parse import unquote
+
 from classes.Observer import Observer
 
 
+def _escape(username):
+    """Percent-encode the characters the waiting_list column uses as separators."""
+    return username.replace("%", "%25").replace(",", "%2C").replace(":", "%3A")
+
+
+class _TicketQueue:
+    """
+    FIFO of unique usernames. Every entry gets an increasing ticket number;
+    cancelled entries stay in the deque as tombstones until they reach the
+    front (or are compacted away). Enqueue, dequeue and membership are O(1)
+    and position lookups O(log n); cancelling inserts into a sorted list,
+    which is a binary search plus a memmove of the later tickets.
+    """
+
+    def __init__(self):
+        self._entries = deque()  # (ticket, username), including cancelled tickets
+        self._tickets = {}  # username -> ticket of the live entry
+        self._cancelled = []  # Sorted tickets of the tombstones; those before _cancelled_start were dequeued
+        self._cancelled_start = 0
+        self._head = 0  # Ticket of the first entry
+        self._next_ticket = 0
+
+    def __len__(self):
+        return len(self._tickets)
+
+    def __contains__(self, username):
+        return username in self._tickets
+
+    def __iter__(self):
+        return (username for ticket, username in self._entries if self._tickets.get(username) == ticket)
+
+    def append(self, username):
+        """Queue a user; returns False if they are already waiting."""
+        if username in self._tickets:
+            return False
+        self._tickets[username] = self._next_ticket
+        self._entries.append((self._next_ticket, username))
+        self._next_ticket += 1
+        return True
+
+    def popleft(self):
+        """Remove and return the first waiting user, or None."""
+        while self._entries:
+            ticket, username = self._entries.popleft()
+            self._head = ticket + 1
+            if self._tickets.get(username) == ticket:
+                del self._tickets[username]
+                return username
+            # Tombstones leave in ticket order: skip the smallest instead of shifting the list
+            self._cancelled_start += 1
+            if self._cancelled_start > 32 and self._cancelled_start * 2 > len(self._cancelled):
+                del self._cancelled[:self._cancelled_start]
+                self._cancelled_start = 0
+        return None
+
+    def cancel(self, username):
+        """Take a user out of the queue; returns False if they were not waiting."""
+        ticket = self._tickets.pop(username, None)
+        if ticket is None:
+            return False
+        insort(self._cancelled, ticket, self._cancelled_start)
+        tombstones = len(self._cancelled) - self._cancelled_start
+        if tombstones > 32 and tombstones > len(self._tickets):
+            self._compact()
+        return True
+
+    def position_of(self, username):
+        """1-based place of a user in the queue, or None if they are not waiting."""
+        ticket = self._tickets.get(username)
+        if ticket is None:
+            return None
+        cancelled_ahead = bisect_left(self._cancelled, ticket, self._cancelled_start) - self._cancelled_start
+        return ticket - self._head - cancelled_ahead + 1
+
+    def clear(self):
+        self._entries.clear()
+        self._tickets.clear()
+        self._cancelled.clear()
+        self._cancelled_start = 0
+        self._head = self._next_ticket
+
+    def _compact(self):
+        """Drop the tombstones and renumber the live entries."""
+        usernames = list(self)
+        self.clear()
+        for username in usernames:
+            self.append(username)
+
+
 class WaitingListManager:
+    # Priority tiers: higher tiers are served first, FIFO within a tier
+    PRIORITY_STANDARD = 0
+    PRIORITY_COURSE_RESERVE = 1
+    PRIORITY_STAFF = 2
+    # NotificationDispatcher given to new observers; None notifies synchronously
+    dispatcher = None
+    # username -> priority tier used when add_to_waiting_list() is not given one
+    priorities = {}
+
     def __init__(self):
-        self.waiting_list = ""  # Comma-separated string for client names
-        self.observers = []  # List of observer instances
+        self._queues = {}  # priority -> users waiting in that tier, in order
+        self._priorities = {}  # username -> priority of the tier they wait in
+        self._observers = {}  # username -> observer instances
+
+    def _ordered_queues(self):
+        return [(priority, self._queues[priority]) for priority in sorted(self._queues, reverse=True)]
+
+    @property
+    def waiting_list(self):
+        """
+        Comma-separated client names in serving order, as stored in the
+        waiting_list CSV column; users above the standard tier are written
+        as "name:priority". "%", "," and ":" in names are percent-encoded.
+        """
+        return ",".join(f"{_escape(username)}:{priority}" if priority else _escape(username)
+                        for priority, queue in self._ordered_queues() for username in queue)
 
-    def add_to_waiting_list(self, username):
+    @waiting_list.setter
+    def waiting_list(self, value):
+        self.clear_waiting_list()
+        for entry in (value or "").split(","):
+            username, _, priority = entry.rpartition(":")
+            if username and priority.lstrip("-").isdigit():
+                self.add_to_waiting_list(unquote(username), int(priority))
+            elif entry:
+                self.add_to_waiting_list(unquote(entry))
+
+    @property
+    def observers(self):
+        """List of observer instances."""
+        return [observer for observers in self._observers.values() for observer in observers]
+
+    @observers.setter
+    def observers(self, observers):
+        self._observers = {}
+        for observer in observers:
+            self.add_observer(observer)
+
+    def add_to_waiting_list(self, username, priority=None):
         """Add a user to the waiting list and register an observer."""
-        if username not in self.get_waiting_list():
-            if self.waiting_list:
-                self.waiting_list += f",{username}"
-            else:
-                self.waiting_list = username
-            self.add_observer(Observer(username))
+        if username in self._priorities:
+            return
+        if priority is None:
+            priority = self.priorities.get(username, self.PRIORITY_STANDARD)
+        queue = self._queues.get(priority)
+        if queue is None:
+            queue = self._queues[priority] = _TicketQueue()
+        queue.append(username)
+        self._priorities[username] = priority
+        self.add_observer(Observer(username, self.dispatcher))
 
     def remove_from_waiting_list(self):
         """Remove the first user in the waiting list and notify them."""
-        current_list = self.get_waiting_list()
-        if current_list:
-            username = current_list.pop(0)
-            self.waiting_list = ",".join(current_list)
-            self.notify_observers(f"The book is now available for {username}.")
-            self.remove_observer_by_username(username)
-            return username
+        for priority, queue in self._ordered_queues():
+            username = queue.popleft()
+            if not queue:
+                del self._queues[priority]
+            if username is not None:
+                del self._priorities[username]
+                self.notify_observers(f"The book is now available for {username}.")
+                self.remove_observer_by_username(username)
+                return username
         return None
 
+    def cancel(self, username):
+        """Take a user off the waiting list; returns False if they were not on it."""
+        priority = self._priorities.pop(username, None)
+        if priority is None:
+            return False
+        queue = self._queues[priority]
+        queue.cancel(username)
+        if not queue:
+            del self._queues[priority]
+        self.remove_observer_by_username(username)
+        return True
+
+    def position_of(self, username):
+        """1-based place of a user in the waiting list, or None if they are not on it."""
+        priority = self._priorities.get(username)
+        if priority is None:
+            return None
+        ahead = sum(len(queue) for other, queue in self._queues.items() if other > priority)
+        return ahead + self._queues[priority].position_of(username)
+
     def clear_waiting_list(self):
         """Clear the waiting list and remove all observers."""
-        self.waiting_list = ""
-        self.observers.clear()
+        self._queues.clear()
+        self._priorities.clear()
+        self._observers.clear()
 
     def get_waiting_list(self):
         """Retrieve the waiting list as a list."""
-        return self.waiting_list.split(",") if self.waiting_list else []
+        return [username for _, queue in self._ordered_queues() for username in queue]
 
     # Observer Management
     def add_observer(self, observer):
         """Add an observer to the list."""
-        self.observers.append(observer)
+        self._observers.setdefault(observer.username, []).append(observer)
 
     def remove_observer_by_username(self, username):
         """Remove an observer based on the username."""
-        self.observers = [obs for obs in self.observers if obs.username != username]
+        self._observers.pop(username, None)
 
     def notify_observers(self, message):
         """Notify all observers with the given message."""
         for observer in self.observers:
             observer.update(message)
-